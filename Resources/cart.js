@@ -46,6 +46,20 @@ const COURSE_CONFIG = {
   },
 };
 
+// One idempotency key per checkout: repeated clicks on the enroll button send
+// the same key, so the server returns the same Razorpay order.
+let checkoutKey = null;
+
+function getCheckoutKey() {
+  if (!checkoutKey) {
+    checkoutKey =
+      window.crypto && crypto.randomUUID
+        ? crypto.randomUUID()
+        : Date.now().toString(36) + "-" + Math.random().toString(36).slice(2);
+  }
+  return checkoutKey;
+}
+
 async function initializeRazorpayPayment(courseId) {
   const fullName = document.querySelector('.form-input[type="text"]').value.trim();
   const countryCode = document.getElementById("country-code").value;
@@ -76,6 +90,7 @@ async function initializeRazorpayPayment(courseId) {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        "Idempotency-Key": getCheckoutKey(),
       },
       body: JSON.stringify({
         course_id: courseId,
@@ -119,6 +134,7 @@ async function initializeRazorpayPayment(courseId) {
         const verifyData = await verifyResponse.json();
 
         if (verifyData.success) {
+          checkoutKey = null;
           const redirectParams = new URLSearchParams(window.location.search);
 
           redirectParams.set("payment_id", response.razorpay_payment_id);
@@ -1,66 +0,0 @@
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
-from pathlib import Path
-
-router = APIRouter()
-
-
-def _read_html_file(filename: str) -> str:
-    # Resolve path to components relative to project root
-    html_path = Path(__file__).resolve().parent.parent / "components" / filename
-    try:
-        return html_path.read_text(encoding="utf-8")
-    except FileNotFoundError:
-        return f"<html><body><h1>{filename} not found</h1></body></html>"
-
-
-@router.get("/fundamentals-of-facebook-ads/cartpage", response_class=HTMLResponse)
-async def cartPage() -> HTMLResponse:
-    content = _read_html_file("cartPage.html")
-    return HTMLResponse(content=content, status_code=200)
-
-@router.get("/fundamentals-of-facebook-ads/students/cart", response_class=HTMLResponse)
-async def checkoutPage() -> HTMLResponse:
-    content = _read_html_file("cartPage_student.html")
-    return HTMLResponse(content=content, status_code=200)
-
-@router.get("/psychology-driven-advanced-meta-ad-course/basic-cart", response_class=HTMLResponse)
-async def basicCart() -> HTMLResponse:
-    content = _read_html_file("basicCart.html")
-    return HTMLResponse(content=content, status_code=200)
-
-
-@router.get("/psychology-driven-advanced-meta-ad-course/Recorded-Course-Plan", response_class=HTMLResponse)
-async def valueCart() -> HTMLResponse:
-    content = _read_html_file("valueCart.html")
-    return HTMLResponse(content=content, status_code=200)
-
-
-@router.get("/psychology-driven-advanced-meta-ad-course/Live-Mentorship-Plan", response_class=HTMLResponse)
-async def businessGrowthCart() -> HTMLResponse:
-    content = _read_html_file("businessGrowthCart.html")
-    return HTMLResponse(content=content, status_code=200)
-
-
-@router.get("/master-creative-targeting/meta-base-cart", response_class=HTMLResponse)
-async def metaBaseCart() -> HTMLResponse:
-    content = _read_html_file("metaBaseCart.html")
-    return HTMLResponse(content=content, status_code=200)
-
-
-@router.get("/master-creative-targeting/meta-mentorship-cart", response_class=HTMLResponse)
-async def metaMentorshipCart() -> HTMLResponse:
-    content = _read_html_file("metaMentorshipCart.html")
-    return HTMLResponse(content=content, status_code=200)
-
-
-@router.get("/growth-plan-for-business-owner/growth-mastery-plan", response_class=HTMLResponse)
-async def valueCartBusiness() -> HTMLResponse:
-    content = _read_html_file("valueCart_business.html")
-    return HTMLResponse(content=content, status_code=200)
-
-
-@router.get("/growth-plan-for-business-owner/growth-partner-plan", response_class=HTMLResponse)
-async def businessGrowthCartBusiness() -> HTMLResponse:
-    content = _read_html_file("businessGrowthCart_business.html")
-    return HTMLResponse(content=content, status_code=200)
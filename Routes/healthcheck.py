@@ -1,7 +1,17 @@
 from fastapi import APIRouter
 
+from Routes.services.resilience import CLOSED
+
 router = APIRouter()
 
 @router.get("/healthcheck")
 async def healthcheck():
-    return {"status": "ok"}
+    # Imported here: Routes/__init__.py loads this module before app.py has
+    # read .env, and graphy pulls in modules that read the environment
+    from Routes.services import graphy
+
+    # Always 200 while the process can serve: an open Graphy circuit means
+    # enrollments are deferred to the queue, not that this instance is broken
+    upstream = graphy.health()
+    degraded = any(circuit["state"] != CLOSED for circuit in upstream["circuits"].values())
+    return {"status": "degraded" if degraded else "ok", "upstreams": {"graphy": upstream}}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from Routes.payments import enrollment_queue
+from Routes.services.enrollment_queue import DONE, FAILED, PENDING, RUNNING
+from Routes.services.metrics import enrollment_queue_jobs, render
+from Routes.services.settings import settings
+
+router = APIRouter()
+
+# When set, scrapers must send `Authorization: Bearer <METRICS_TOKEN>`
+METRICS_TOKEN = settings.metrics_token
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    counts = await enrollment_queue.counts()
+    for status in (PENDING, RUNNING, DONE, FAILED):
+        enrollment_queue_jobs.set(counts.get(status, 0), status)
+
+    return Response(content=render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,56 @@
+"""
+Page manifest: every HTML page URL and the file it is served from.
+
+Adding a funnel page is one PageRoute line. Entries are served by the
+PageTable route (Routes/services/page_routes.py) from the in-memory page
+registry; keys are paths relative to the project root.
+"""
+
+from Routes.services.page_routes import PageRoute
+
+PAGES = (
+    # Landing, courses and contact
+    PageRoute("/", "components/landingPage.html", "Landing Page not found"),
+    PageRoute("/courses", "components/courses.html", "Courses page not found"),
+    PageRoute("/contact-us", "components/contactUs.html", "Contact Us page not found"),
+
+    # Fundamentals of Facebook Ads
+    PageRoute("/fundamentals-of-facebook-ads", "components/homepage.html", "Homepage not found"),
+    PageRoute("/fundamentals-of-facebook-ads/students", "components/homepage_students.html"),
+    PageRoute("/fundamentals-of-facebook-ads/business-owners", "components/homepage_business_owners.html"),
+    PageRoute("/fundamentals-of-facebook-ads/cartpage", "components/cartPage.html", "cartPage.html not found"),
+    PageRoute("/fundamentals-of-facebook-ads/students/cart", "components/cartPage_student.html", "cartPage_student.html not found"),
+    PageRoute("/fundamentals-of-facebook-ads/thankyou", "components/thankYouPage.html", "Thank You Page not found"),
+
+    # Psychology-driven advanced Meta ad course
+    PageRoute("/psychology-driven-advanced-meta-ad-course", "components/advanced_homepage_student.html", "Advanced Homepage not found"),
+    PageRoute("/psychology-driven-advanced-meta-ad-course/basic-cart", "components/basicCart.html", "basicCart.html not found"),
+    PageRoute("/psychology-driven-advanced-meta-ad-course/Recorded-Course-Plan", "components/valueCart.html", "valueCart.html not found"),
+    PageRoute("/psychology-driven-advanced-meta-ad-course/Live-Mentorship-Plan", "components/businessGrowthCart.html", "businessGrowthCart.html not found"),
+    PageRoute("/psychology-driven-advanced-meta-ad-course/basic-plan/thankyou", "components/thankYouPage.html", "Thank You Page not found"),
+    PageRoute("/psychology-driven-advanced-meta-ad-course/Recorded-Course-Plan/thankyou", "components/thankYouPage.html", "Thank You Page not found"),
+    PageRoute("/psychology-driven-advanced-meta-ad-course/Live-Mentorship-Plan/thankyou", "components/thankYouPage.html", "Thank You Page not found"),
+
+    # Growth plan for business owners
+    PageRoute("/growth-plan-for-business-owner", "components/advanced_homepage_business.html", "Advanced Homepage not found"),
+    PageRoute("/growth-plan-for-business-owner/growth-mastery-plan", "components/valueCart_business.html", "valueCart_business.html not found"),
+    PageRoute("/growth-plan-for-business-owner/growth-partner-plan", "components/businessGrowthCart_business.html", "businessGrowthCart_business.html not found"),
+    PageRoute("/growth-plan-for-business-owner/business-growth-mastery-plan/thankyou", "components/thankYouPage.html", "Thank You Page not found"),
+    PageRoute("/growth-plan-for-business-owner/business-growth-partner-plan/thankyou", "components/thankYouPage.html", "Thank You Page not found"),
+
+    # Master creative targeting
+    PageRoute("/master-creative-targeting", "components/metaHomepage.html", "Homepage not found"),
+    PageRoute("/master-creative-targeting/meta-base-cart", "components/metaBaseCart.html", "metaBaseCart.html not found"),
+    PageRoute("/master-creative-targeting/meta-mentorship-cart", "components/metaMentorshipCart.html", "metaMentorshipCart.html not found"),
+    PageRoute("/master-creative-targeting/base-plan/thankyou", "components/metaThankyou.html", "Meta Thank You Page not found"),
+    PageRoute("/master-creative-targeting/mentorship-plan/thankyou", "components/metaThankyou.html", "Meta Thank You Page not found"),
+
+    # Policies
+    PageRoute("/privacy-policy", "components/privacyPolicy.html"),
+    PageRoute("/refund-policy", "components/refundPolicy.html"),
+    PageRoute("/terms-and-conditions", "components/termsAndConditions.html"),
+
+    # Figma reference exports
+    PageRoute("/desktop", "figma_reference/desktop.html"),
+    PageRoute("/thank", "figma_reference/thankyou.html"),
+)
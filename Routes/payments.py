@@ -1,17 +1,21 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-import razorpay
+from typing import Optional
+import httpx
 import hmac
 import hashlib
 import os
 import logging
-from dotenv import load_dotenv
 from Routes.services.graphy import create_and_enroll_learner
+from Routes.services.razorpay_orders import RazorpayOrdersClient
+from Routes.services.catalog import load_catalog, receipt_ids
+from Routes.services.idempotency import IdempotencyCache, idempotency_key
+from Routes.services.enrollment_queue import EnrollmentQueue
+from Routes.services.processed_payments import ProcessedPayments
+from Routes.services.log_pipeline import SAMPLED
+from Routes.services.settings import settings
 
-load_dotenv()
-
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -38,20 +42,32 @@ def verify_request_origin(request: Request):
         is_allowed = True
         
     if not is_allowed:
-        logger.warning(f"Blocked unauthorized payment API access. Origin: {origin}, Referer: {referer}")
+        logger.warning("Blocked unauthorized payment API access. Origin: %s, Referer: %s", origin, referer)
         raise HTTPException(status_code=403, detail="Access Denied: Invalid Request Source")
 
 
-RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
-RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
-TEST_PRICE_OVERRIDE = os.getenv("TEST_PRICE_OVERRIDE")
+RAZORPAY_KEY_ID = settings.razorpay_key_id
+RAZORPAY_KEY_SECRET = settings.razorpay_key_secret
+TEST_PRICE_OVERRIDE = settings.test_price_override
 
-logger.info(f"Razorpay Key ID loaded: {RAZORPAY_KEY_ID[:10]}..." if RAZORPAY_KEY_ID else "Razorpay Key ID NOT loaded")
-logger.info(f"Razorpay Key Secret loaded: {'Yes' if RAZORPAY_KEY_SECRET else 'No'}")
+if RAZORPAY_KEY_ID:
+    logger.info("Razorpay Key ID loaded: %s...", RAZORPAY_KEY_ID[:10])
+else:
+    logger.info("Razorpay Key ID NOT loaded")
+logger.info("Razorpay Key Secret loaded: %s", "Yes" if RAZORPAY_KEY_SECRET else "No")
 if TEST_PRICE_OVERRIDE:
-    logger.warning(f"TEST_PRICE_OVERRIDE is active: all Razorpay orders will be charged {TEST_PRICE_OVERRIDE} paise")
+    logger.warning("TEST_PRICE_OVERRIDE is active: all Razorpay orders will be charged %s paise", TEST_PRICE_OVERRIDE)
+
+orders_client = RazorpayOrdersClient(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET)
 
-client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+# Duplicate create-order requests (double clicks, client retries) with the same
+# client idempotency key within the TTL reuse the first request's Razorpay
+# order instead of creating another.
+ORDER_IDEMPOTENCY_TTL = float(os.getenv("ORDER_IDEMPOTENCY_TTL", "300"))
+ORDER_IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("ORDER_IDEMPOTENCY_MAX_ENTRIES", "10000"))
+MAX_IDEMPOTENCY_KEY_LENGTH = 128
+
+recent_orders = IdempotencyCache("create_order", ORDER_IDEMPOTENCY_TTL, ORDER_IDEMPOTENCY_MAX_ENTRIES)
 
 
 COURSE_PRICES = {
@@ -111,10 +127,16 @@ COURSE_PRICES = {
     }
 }
 
-for cid, cdata in COURSE_PRICES.items():
-    env_val = os.getenv(cdata["price_env"])
-    if env_val:
-        logger.warning(f"Price override active for '{cid}': {env_val} paise (env: {cdata['price_env']})")
+# Built once from COURSE_PRICES and the PRICE_* overrides; rebuilt on SIGHUP
+catalog = load_catalog(COURSE_PRICES)
+
+
+def reload_catalog():
+    global catalog
+    try:
+        catalog = load_catalog(COURSE_PRICES, reload=True)
+    except Exception as e:
+        logger.error("Course catalog reload failed, keeping the current prices: %s", e)
 
 
 class CreateOrderRequest(BaseModel):
@@ -122,6 +144,7 @@ class CreateOrderRequest(BaseModel):
     name: str
     email: str
     phone: str
+    idempotency_key: Optional[str] = None
 
 
 class VerifyPaymentRequest(BaseModel):
@@ -138,87 +161,121 @@ class VerifyPaymentRequest(BaseModel):
 async def create_order(request: CreateOrderRequest, req: Request, _=Depends(verify_request_origin)):
     """
     Create a Razorpay order for the specified course.
+
+    Requests carrying the same Idempotency-Key header (or idempotency_key field)
+    for the same course and customer share one Razorpay order. Requests without
+    a key always create a new order: a customer may buy the same course again.
     """
-    logger.info(f"Creating order for course: {request.course_id}")
-    logger.info(f"Customer: {request.name}, Email: {request.email}, Phone: {request.phone}")
+    logger.info(
+        "Creating order for course: %s | Customer: %s, Email: %s, Phone: %s",
+        request.course_id, request.name, request.email, request.phone, extra=SAMPLED,
+    )
     
-    course = COURSE_PRICES.get(request.course_id)
+    course = catalog.get(request.course_id)
     
     if not course:
-        logger.error(f"Invalid course ID: {request.course_id}")
+        logger.error("Invalid course ID: %s", request.course_id)
         raise HTTPException(status_code=400, detail="Invalid course ID")
-    
-    try:
-        import time
-        receipt_id = f"rcpt_{int(time.time())}"
-        
-        env_override = os.getenv(course["price_env"])
-        charge_amount = int(env_override) if env_override else course["amount"]
-        
-        order_data = {
-            "amount": charge_amount,
-            "currency": course["currency"],
-            "receipt": receipt_id,
-            "notes": {
-                "course_id": request.course_id,
-                "course_name": course["name"],
-                "customer_name": request.name,
-                "customer_email": request.email,
-                "customer_phone": request.phone
+
+    token = req.headers.get("idempotency-key") or request.idempotency_key
+    if token and len(token) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency key too long")
+
+    async def create():
+        try:
+            order_data = {
+                "amount": course.amount,
+                "currency": course.currency,
+                "receipt": receipt_ids.next(),
+                "notes": {
+                    "course_id": course.course_id,
+                    "course_name": course.name,
+                    "customer_name": request.name,
+                    "customer_email": request.email,
+                    "customer_phone": request.phone
+                }
             }
-        }
-        
-        logger.info(f"Order data: {order_data}")
-        order = client.order.create(data=order_data)
-        logger.info(f"Order created successfully: {order['id']}")
-        
-        return JSONResponse(content={
-            "success": True,
-            "order_id": order["id"],
-            "amount": charge_amount,
-            "currency": course["currency"],
-            "key_id": RAZORPAY_KEY_ID,
-            "course_name": course["name"],
-            "prefill": {
-                "name": request.name,
-                "email": request.email,
-                "contact": request.phone
+            
+            logger.debug("Order data: %s", order_data)
+            order = await orders_client.create_order(order_data)
+            logger.info("Order created successfully: %s", order["id"])
+            
+            return {
+                "success": True,
+                "order_id": order["id"],
+                "amount": course.amount,
+                "currency": course.currency,
+                "key_id": RAZORPAY_KEY_ID,
+                "course_name": course.name,
+                "prefill": {
+                    "name": request.name,
+                    "email": request.email,
+                    "contact": request.phone
+                }
             }
-        })
-    except Exception as e:
-        logger.error(f"Error creating order: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=str(e))
+        except httpx.TimeoutException as e:
+            logger.error("Timed out creating order: %r", e)
+            raise HTTPException(status_code=504, detail="Payment gateway timed out")
+        except Exception as e:
+            logger.exception("Error creating order: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
 
+    if not token:
+        return JSONResponse(content=await create())
+    key = idempotency_key(
+        course.course_id, str(course.amount), request.name.strip(), request.email.strip().lower(),
+        request.phone.strip(), token,
+    )
+    return JSONResponse(content=await recent_orders.run(key, create))
 
-async def _enroll_on_graphy(email: str, name: str, phone: str, course_id: str, razorpay_payment_id: str):
+
+async def _enroll_on_graphy(job: dict):
     """
-    Background task: Create learner on Graphy and enroll them in the purchased course.
-    Runs after the payment verification response is sent to the user.
+    Enrollment queue handler: Create learner on Graphy and enroll them in the purchased course.
+    Raising marks the attempt as failed so the queue retries it with backoff.
     """
-    try:
-        result = await create_and_enroll_learner(
-            email=email,
-            name=name,
-            phone=phone,
-            course_id=course_id,
-            razorpay_payment_id=razorpay_payment_id,
-        )
-        if result["course_assigned"]:
-            logger.info(f"Graphy enrollment SUCCESS for {email} | course: {course_id} | payment: {razorpay_payment_id}")
-        else:
-            logger.error(f"Graphy enrollment FAILED for {email} | course: {course_id} | details: {result}")
-    except Exception as e:
-        logger.error(f"Graphy enrollment background task error for {email}: {str(e)}")
+    email = job["email"]
+    course_id = job["course_id"]
+    razorpay_payment_id = job["razorpay_payment_id"]
+    result = await create_and_enroll_learner(
+        email=email,
+        name=job["name"],
+        phone=job["phone"],
+        course_id=course_id,
+        razorpay_payment_id=razorpay_payment_id,
+    )
+    if not result["course_assigned"]:
+        logger.error("Graphy enrollment FAILED for %s | course: %s | details: %s", email, course_id, result)
+        raise RuntimeError((result.get("assign_response") or {}).get("error", "Graphy enrollment failed"))
+    logger.info("Graphy enrollment SUCCESS for %s | course: %s | payment: %s", email, course_id, razorpay_payment_id)
+
+
+enrollment_queue = EnrollmentQueue(handler=_enroll_on_graphy)
+processed_payments = ProcessedPayments()
+
+
+def _verified_response(request: VerifyPaymentRequest) -> JSONResponse:
+    return JSONResponse(content={
+        "success": True,
+        "message": "Payment verified successfully",
+        "payment_id": request.razorpay_payment_id,
+        "order_id": request.razorpay_order_id
+    })
 
 
 @router.post("/api/verify-payment")
-async def verify_payment(request: VerifyPaymentRequest, background_tasks: BackgroundTasks, req: Request, _=Depends(verify_request_origin)):
+async def verify_payment(request: VerifyPaymentRequest, req: Request, _=Depends(verify_request_origin)):
     """
     Verify the Razorpay payment signature, confirm the payment,
-    and trigger Graphy learner creation + course enrollment in the background.
+    and queue Graphy learner creation + course enrollment on the durable enrollment queue.
+    A payment that was already verified returns the same result without being queued again.
     """
+    if processed_payments.is_processed(
+        request.razorpay_payment_id, request.razorpay_order_id, request.razorpay_signature
+    ):
+        logger.info("Payment %s already verified, returning cached result", request.razorpay_payment_id)
+        return _verified_response(request)
+
     try:
         message = f"{request.razorpay_order_id}|{request.razorpay_payment_id}"
         generated_signature = hmac.new(
@@ -227,24 +284,21 @@ async def verify_payment(request: VerifyPaymentRequest, background_tasks: Backgr
             hashlib.sha256
         ).hexdigest()
         
-        if generated_signature != request.razorpay_signature:
+        if not hmac.compare_digest(generated_signature, request.razorpay_signature):
             raise HTTPException(status_code=400, detail="Invalid payment signature")
         
-        background_tasks.add_task(
-            _enroll_on_graphy,
-            email=request.email,
-            name=request.name,
-            phone=request.phone,
-            course_id=request.course_id,
-            razorpay_payment_id=request.razorpay_payment_id,
+        await enrollment_queue.enqueue(request.razorpay_payment_id, {
+            "email": request.email,
+            "name": request.name,
+            "phone": request.phone,
+            "course_id": request.course_id,
+            "razorpay_payment_id": request.razorpay_payment_id,
+        })
+        await processed_payments.record(
+            request.razorpay_payment_id, request.razorpay_order_id, request.razorpay_signature
         )
         
-        return JSONResponse(content={
-            "success": True,
-            "message": "Payment verified successfully",
-            "payment_id": request.razorpay_payment_id,
-            "order_id": request.razorpay_order_id
-        })
+        return _verified_response(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,138 @@
+"""
+Content-Addressed Asset Store.
+
+Several Resources/ subfolders hold byte-identical copies of the same file under
+different names (e.g. HomePage/proof3.gif, MetaHomepage/proof-5.gif and
+AdvHomePage/proof-4.gif), so a visitor moving between funnels downloads each
+copy separately. This store indexes Resources/ by SHA-256 and gives every
+distinct file one canonical URL, /assets/<hash><ext>, served as immutable.
+
+- Pages are rewritten at load time to reference canonical URLs.
+- Legacy /Resources/... paths of duplicated files redirect to the canonical URL
+  (disable with ASSET_DEDUP_REDIRECT=false); unique files are served in place.
+
+No files are copied: the canonical URL is served straight from the first
+original path with that content.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from Routes.services.http_cache import ASSET_URL_RE, resolve_static_path
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+RESOURCES_DIR = PROJECT_ROOT / "Resources"
+ASSET_URL_PREFIX = "/assets/"
+ASSET_DEDUP_REDIRECT = os.getenv("ASSET_DEDUP_REDIRECT", "true").lower() in ("1", "true", "yes")
+
+# Generated directories whose files are already content-addressed.
+EXCLUDED_DIRECTORIES = {"_extracted", "_optimized"}
+
+
+class AssetStore:
+    """Index of Resources/ by content hash."""
+
+    def __init__(self, root: Path = RESOURCES_DIR):
+        self.root = root
+        self.built = False
+        self._by_name: Dict[str, str] = {}
+        self._by_path: Dict[str, str] = {}
+        self._duplicates: Set[str] = set()
+
+    def _walk(self) -> Iterator[str]:
+        for directory, subdirectories, files in os.walk(self.root):
+            subdirectories[:] = sorted(d for d in subdirectories if d not in EXCLUDED_DIRECTORIES)
+            for filename in sorted(files):
+                yield os.path.realpath(os.path.join(directory, filename))
+
+    def build(self) -> int:
+        """Hash every file under the root. Returns the number of distinct files."""
+        names = {}
+        for full_path in self._walk():
+            with open(full_path, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()[:20]
+            names[full_path] = f"{digest}{os.path.splitext(full_path)[1].lower()}"
+        self._index(names)
+        logger.info("Asset store indexed %d files as %d distinct assets", len(self._by_path), len(self._by_name))
+        return len(self._by_name)
+
+    def _index(self, names: Dict[str, str]) -> None:
+        groups: Dict[str, list] = {}
+        for full_path, name in names.items():
+            groups.setdefault(name, []).append(full_path)
+        by_name, duplicates = {}, set()
+        for name, paths in groups.items():
+            by_name[name] = paths[0]
+            if len(paths) > 1:
+                duplicates.update(paths)
+        self._by_name, self._by_path, self._duplicates = by_name, dict(names), duplicates
+        self.built = True
+
+    def files(self) -> Dict[str, str]:
+        """Every indexed file (full path) and its canonical asset name."""
+        return dict(self._by_path)
+
+    def restore(self, files: Dict[str, Tuple[str, int, int]]) -> bool:
+        """
+        Adopt a saved index instead of hashing every file, if it still matches
+        the files on disk.
+
+        Args:
+            files: {path relative to the root: (name, mtime_ns, size)}.
+
+        Returns:
+            False, leaving the store unbuilt, if any file was added, removed
+            or modified since the index was saved.
+        """
+        names = {}
+        for full_path in self._walk():
+            entry = files.get(os.path.relpath(full_path, self.root))
+            stat = os.stat(full_path)
+            if entry is None or (entry[1], entry[2]) != (stat.st_mtime_ns, stat.st_size):
+                return False
+            names[full_path] = entry[0]
+        if len(names) != len(files):
+            return False
+        self._index(names)
+        logger.info("Asset store restored %d files as %d distinct assets", len(self._by_path), len(self._by_name))
+        return True
+
+    def canonical_url(self, full_path: str) -> Optional[str]:
+        name = self._by_path.get(full_path)
+        return f"{ASSET_URL_PREFIX}{name}" if name else None
+
+    def lookup(self, name: str) -> Optional[str]:
+        return self._by_name.get(name)
+
+    def names(self) -> Dict[str, str]:
+        """Every canonical asset name and the file it is served from."""
+        return dict(self._by_name)
+
+    def is_duplicate(self, full_path: str) -> bool:
+        return full_path in self._duplicates
+
+
+asset_store = AssetStore()
+
+
+def canonical_asset_urls(key: str, html: str) -> str:
+    """Page registry transform: point /Resources references at canonical /assets URLs."""
+    if not asset_store.built:
+        asset_store.build()
+
+    def _replace(match: re.Match) -> str:
+        if match.group("mount") != "Resources":
+            return match.group(0)
+        full_path = resolve_static_path("Resources", match.group("path"))
+        url = asset_store.canonical_url(full_path) if full_path else None
+        if url is None:
+            return match.group(0)
+        return f"{match.group('prefix')}{url}"
+
+    return ASSET_URL_RE.sub(_replace, html)
@@ -0,0 +1,244 @@
+"""
+Graphy Enrollment Backfill.
+
+Reconciles a Razorpay payments export against Graphy by running
+create_and_enroll_learner for every payment, concurrently and under a rate
+limit. Use it after a Graphy outage to enroll everyone whose enrollment job
+failed.
+
+Input is CSV or JSONL (chosen by file extension). Each row needs a payment ID,
+email, name, phone and course ID; these are read from our own column names
+(razorpay_payment_id, email, name, phone, course_id) or from a Razorpay
+payments export (id, email, contact, status and the `notes` JSON that
+/api/create-order attaches to every order).
+
+Progress is checkpointed to a resume file: re-running the same command skips
+rows that already succeeded (or can never succeed) and retries the rest. Every
+processed row is appended to a JSONL report.
+
+    python -m Routes.services.backfill payments.csv --workers 8 --rate 5
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from Routes.services.graphy import COURSE_GRAPHY_PRODUCT_MAP, _sanitize_phone, close_client, create_and_enroll_learner
+
+logger = logging.getLogger(__name__)
+
+# Razorpay payment statuses that mean the customer was charged.
+PAID_STATUSES = {"captured", "authorized"}
+
+
+class RateLimiter:
+    """Token bucket limiting how many enrollments start per second."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _read_rows(path: Path) -> Iterator[dict]:
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def normalize_row(row: dict) -> dict:
+    """Map our own or Razorpay-export column names onto the enrollment fields."""
+    notes = row.get("notes") or {}
+    if isinstance(notes, str):
+        try:
+            notes = json.loads(notes) if notes.strip() else {}
+        except ValueError:
+            notes = {}
+
+    def pick(*values) -> str:
+        for value in values:
+            if value:
+                return str(value).strip()
+        return ""
+
+    return {
+        "razorpay_payment_id": pick(row.get("razorpay_payment_id"), row.get("payment_id"), row.get("id")),
+        "email": pick(row.get("email"), notes.get("customer_email")),
+        "name": pick(row.get("name"), notes.get("customer_name")),
+        "phone": pick(row.get("phone"), row.get("contact"), notes.get("customer_phone")),
+        "course_id": pick(row.get("course_id"), notes.get("course_id")),
+        "status": pick(row.get("status")).lower(),
+    }
+
+
+def validate_row(job: dict) -> Optional[str]:
+    """Return why a row can't be enrolled, or None if it can."""
+    if not job["razorpay_payment_id"]:
+        return "missing payment id"
+    if job["status"] and job["status"] not in PAID_STATUSES:
+        return f"payment status is {job['status']}"
+    if not job["email"]:
+        return "missing email"
+    if job["course_id"] not in COURSE_GRAPHY_PRODUCT_MAP:
+        return f"unknown course id: {job['course_id'] or '(empty)'}"
+    if not COURSE_GRAPHY_PRODUCT_MAP[job["course_id"]]:
+        return f"no Graphy product configured for {job['course_id']}"
+    return None
+
+
+def _load_checkpoint(path: Path) -> Set[str]:
+    if not path.exists():
+        return set()
+    return {line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()}
+
+
+async def run_backfill(
+    input_path: Path,
+    report_path: Path,
+    resume_path: Path,
+    workers: int = 8,
+    rate: float = 5.0,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Enroll every payment in input_path that isn't already in the resume file.
+
+    Returns:
+        Count of rows per outcome ('enrolled', 'failed', 'invalid', 'skipped').
+    """
+    done = _load_checkpoint(resume_path)
+    seen: Set[str] = set()
+    jobs: List[dict] = []
+    summary = {"enrolled": 0, "failed": 0, "invalid": 0, "skipped": 0}
+
+    report = report_path.open("a", encoding="utf-8")
+    checkpoint = resume_path.open("a", encoding="utf-8")
+
+    def record(job: dict, outcome: str, detail: str = "", finished: bool = True) -> None:
+        summary[outcome] += 1
+        report.write(json.dumps({
+            "razorpay_payment_id": job["razorpay_payment_id"],
+            "email": job["email"],
+            "phone": _sanitize_phone(job["phone"]),
+            "course_id": job["course_id"],
+            "outcome": outcome,
+            "detail": detail,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }) + "\n")
+        if finished and job["razorpay_payment_id"]:
+            checkpoint.write(job["razorpay_payment_id"] + "\n")
+            checkpoint.flush()
+
+    for row in _read_rows(input_path):
+        job = normalize_row(row)
+        payment_id = job["razorpay_payment_id"]
+        # Rows without a payment ID are never duplicates; validate_row reports them
+        if payment_id and (payment_id in done or payment_id in seen):
+            summary["skipped"] += 1
+            continue
+        if payment_id:
+            seen.add(payment_id)
+        reason = validate_row(job)
+        if reason:
+            record(job, "invalid", reason)
+        else:
+            jobs.append(job)
+
+    logger.info("Backfill: %d payments to enroll, %d already done, %d invalid", len(jobs), summary["skipped"], summary["invalid"])
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    limiter = RateLimiter(rate, burst=workers)
+    started = time.monotonic()
+
+    async def worker() -> None:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if dry_run:
+                record(job, "skipped", "dry run", finished=False)
+                continue
+            await limiter.acquire()
+            try:
+                result = await create_and_enroll_learner(
+                    email=job["email"],
+                    name=job["name"],
+                    phone=job["phone"],
+                    course_id=job["course_id"],
+                    razorpay_payment_id=job["razorpay_payment_id"],
+                )
+            except Exception as e:
+                record(job, "failed", str(e), finished=False)
+                continue
+            if result["course_assigned"]:
+                record(job, "enrolled")
+            else:
+                error = (result.get("assign_response") or {}).get("error", "")
+                record(job, "failed", error, finished=False)
+            completed = summary["enrolled"] + summary["failed"]
+            if completed % 100 == 0:
+                logger.info("Backfill progress: %d/%d in %.1fs", completed, len(jobs), time.monotonic() - started)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    finally:
+        report.close()
+        checkpoint.close()
+        await close_client()
+
+    logger.info("Backfill finished in %.1fs: %s", time.monotonic() - started, summary)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Enroll learners on Graphy from a payments export")
+    parser.add_argument("input", type=Path, help="CSV or JSONL payments export")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent enrollments (default: 8)")
+    parser.add_argument("--rate", type=float, default=5.0, help="max enrollments started per second, 0 = unlimited (default: 5)")
+    parser.add_argument("--report", type=Path, help="JSONL report path (default: <input>.report.jsonl)")
+    parser.add_argument("--resume", type=Path, help="checkpoint file (default: <input>.resume)")
+    parser.add_argument("--dry-run", action="store_true", help="validate rows without calling Graphy")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = asyncio.run(run_backfill(
+        args.input,
+        report_path=args.report or args.input.with_suffix(".report.jsonl"),
+        resume_path=args.resume or args.input.with_suffix(".resume"),
+        workers=args.workers,
+        rate=args.rate,
+        dry_run=args.dry_run,
+    ))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
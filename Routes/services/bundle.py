@@ -0,0 +1,283 @@
+"""
+Packed Page Bundle.
+
+One read-only file holding everything the page and compression caches would
+otherwise build at startup: every page of the page registry (body, gzip and
+brotli variants, headers), the precompressed variants of the static text
+assets and the asset store's hash index. It is built at image build time:
+
+    python -m Routes.services.bundle        # writes .precompressed/pages.bundle
+
+File layout: the 8-byte magic, the index length as a little-endian uint64,
+the JSON index, then the bodies back to back (index offsets are relative to
+the first body byte).
+
+At startup the file is mapped read-only with mmap and the caches take their
+bodies as memoryview slices of the mapping. Loading therefore reads and
+compresses no source files and hashes no assets. The bodies stay in the OS
+page cache, shared by every worker process, instead of being copied into each
+worker's heap, so memory stays flat as workers are added.
+
+An entry is used only while its source file still has the mtime (and, for
+assets, the size) recorded in the index. A page's layout counts as one of its
+sources, and so does every file it references by a ?v= versioned URL: if one
+of those changed content, the page would pin the old version. Pages also
+depend on the registry's transforms (EXTRACT_INLINE_IMAGES switches one on
+or off) and on the image manifest the <picture> transform reads; if either
+differs from build time, no bundled page is used. Anything stale
+or missing is built the normal way. Rebuild the bundle
+whenever pages or assets change; the Dockerfile does so after the compression
+build.
+
+Settings (environment):
+    PAGE_BUNDLE     bundle path (default .precompressed/pages.bundle); empty
+                    to disable
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from Routes.services.asset_store import asset_store
+from Routes.services.compression import BUILD_LEVELS, PRECOMPRESSED_DIR, static_variants
+from Routes.services.http_cache import STATIC_MOUNTS, VERSION_PARAM, asset_versions, resolve_static_path
+from Routes.services.images import MANIFEST_PATH
+from Routes.services.pages import Page, registry
+from Routes.services.templates import page_mtime_ns
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PAGE_BUNDLE = os.getenv("PAGE_BUNDLE", str(PRECOMPRESSED_DIR / "pages.bundle"))
+
+MAGIC = b"RGBNDL04"
+_LENGTH = struct.Struct("<Q")
+
+Span = Tuple[int, int]
+
+# Versioned static URLs as written by http_cache.version_asset_urls
+_VERSIONED_URL_RE = re.compile(
+    rf"""/(?P<mount>{"|".join(STATIC_MOUNTS)})/(?P<path>[^"'()?#\s]+)\?{VERSION_PARAM}=(?P<version>[0-9a-f]+)"""
+)
+
+
+def _versioned_assets(body: bytes) -> Dict[str, Tuple[int, str]]:
+    """{path relative to the project root: (mtime_ns, version)} of every versioned URL in a page."""
+    assets = {}
+    for match in _VERSIONED_URL_RE.finditer(body.decode("utf-8")):
+        full_path = resolve_static_path(match.group("mount"), match.group("path"))
+        if full_path is not None:
+            mtime_ns, version = os.stat(full_path).st_mtime_ns, match.group("version")
+            if asset_versions.version(full_path, mtime_ns) != version:
+                # Changed since the page was built; never matches on load
+                mtime_ns = -1
+            assets[os.path.relpath(full_path, PROJECT_ROOT)] = (mtime_ns, version)
+    return assets
+
+
+def _versions_unchanged(assets: Dict[str, Tuple[int, str]]) -> bool:
+    for relative, (mtime_ns, version) in assets.items():
+        full_path = os.path.realpath(PROJECT_ROOT / relative)
+        try:
+            current_mtime_ns = os.stat(full_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        # A touched but unchanged file keeps its version
+        if current_mtime_ns != mtime_ns and asset_versions.version(full_path, current_mtime_ns) != version:
+            return False
+    return True
+
+
+def _page_inputs() -> Dict[str, object]:
+    """What every page is built from besides its own sources: the transforms and the image manifest."""
+    try:
+        manifest = hashlib.sha256(MANIFEST_PATH.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        manifest = None
+    return {"transforms": [transform.__name__ for transform in registry.transforms], "image_manifest": manifest}
+
+
+class _Writer:
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> Span:
+        span = (self.size, len(data))
+        self.chunks.append(data)
+        self.size += len(data)
+        return span
+
+
+class Bundle:
+    """A mapped bundle file. Bodies are memoryviews into the mapping."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a page bundle")
+        (index_length,) = _LENGTH.unpack_from(self._mmap, len(MAGIC))
+        index_start = len(MAGIC) + _LENGTH.size
+        self.index = json.loads(self._mmap[index_start:index_start + index_length])
+        self._data_start = index_start + index_length
+        self._view = memoryview(self._mmap)
+        self.path = path
+
+    def body(self, span: Span) -> memoryview:
+        offset, length = span
+        start = self._data_start + offset
+        return self._view[start:start + length]
+
+    def pages(self, root: Path) -> List[Page]:
+        """Pages whose sources are unchanged since the bundle was built."""
+        pages = []
+        for key, entry in self.index["pages"].items():
+            try:
+                if page_mtime_ns(root / key, root) != entry["mtime_ns"]:
+                    continue
+            except FileNotFoundError:
+                continue
+            if not _versions_unchanged(entry["versioned_assets"]):
+                continue
+            variants = {
+                encoding: (self.body(span), headers)
+                for encoding, (span, headers) in entry["variants"].items()
+            }
+            pages.append(Page(
+                key=key,
+                body=self.body(entry["body"]),
+                etag=entry["etag"],
+                mtime_ns=entry["mtime_ns"],
+                headers=entry["headers"],
+                variants=variants,
+                links=tuple(entry["links"]),
+            ))
+        return pages
+
+    def static_variants(self) -> List[Tuple[str, int, str, Dict[str, memoryview]]]:
+        """(full path, mtime_ns, digest, variants) of unchanged static text assets."""
+        entries = []
+        for relative, entry in self.index["static"].items():
+            full_path = os.path.realpath(PROJECT_ROOT / relative)
+            try:
+                if os.stat(full_path).st_mtime_ns != entry["mtime_ns"]:
+                    continue
+            except FileNotFoundError:
+                continue
+            variants = {encoding: self.body(span) for encoding, span in entry["variants"].items()}
+            entries.append((full_path, entry["mtime_ns"], entry["digest"], variants))
+        return entries
+
+
+_bundle: Optional[Bundle] = None
+
+
+def load_bundle(path: str = PAGE_BUNDLE) -> Optional[Bundle]:
+    """
+    Map the bundle and fill the asset store, page registry and static variant
+    store from it. Safe to call more than once; returns None if there is no
+    usable bundle.
+    """
+    global _bundle
+    if _bundle is not None or not path:
+        return _bundle
+    try:
+        bundle = Bundle(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring page bundle %s: %s", path, e)
+        return None
+
+    assets = {relative: tuple(entry) for relative, entry in bundle.index["assets"].items()}
+    if asset_store.built:
+        current = {os.path.relpath(full_path, asset_store.root): name for full_path, name in asset_store.files().items()}
+        assets_unchanged = current == {relative: entry[0] for relative, entry in assets.items()}
+    else:
+        assets_unchanged = asset_store.restore(assets)
+    variants = bundle.static_variants()
+    for full_path, mtime_ns, digest, encoded in variants:
+        static_variants.put(full_path, mtime_ns, digest, encoded)
+
+    # Bundled pages embed asset URLs and versions and the output of the page
+    # transforms; if any asset or transform input changed they may be stale,
+    # so the pages are rebuilt from source instead
+    pages = []
+    if (
+        assets_unchanged
+        and len(variants) == len(bundle.index["static"])
+        and bundle.index["page_inputs"] == _page_inputs()
+    ):
+        pages = bundle.pages(registry.root)
+        for page in pages:
+            registry.put(page)
+    logger.info(
+        "Page bundle %s: %d/%d pages, %d/%d static assets",
+        path, len(pages), len(bundle.index["pages"]), len(variants), len(bundle.index["static"]),
+    )
+    _bundle = bundle
+    return bundle
+
+
+def build_bundle(path: str = PAGE_BUNDLE) -> int:
+    """Build every cache from the source files and pack it into path. Returns the file size."""
+    if not asset_store.built:
+        asset_store.build()
+    registry.preload(levels=BUILD_LEVELS)
+    static_variants.preload(levels=BUILD_LEVELS)
+
+    writer = _Writer()
+    pages = {}
+    for key, page in sorted(registry.pages().items()):
+        pages[key] = {
+            "mtime_ns": page.mtime_ns,
+            "etag": page.etag,
+            "headers": page.headers,
+            "links": page.links,
+            "versioned_assets": _versioned_assets(bytes(page.body)),
+            "body": writer.add(page.body),
+            "variants": {
+                encoding: (writer.add(data), headers)
+                for encoding, (data, headers) in page.variants.items()
+            },
+        }
+    static = {}
+    for full_path, (mtime_ns, digest, variants) in sorted(static_variants.entries().items()):
+        static[os.path.relpath(full_path, PROJECT_ROOT)] = {
+            "mtime_ns": mtime_ns,
+            "digest": digest,
+            "variants": {encoding: writer.add(data) for encoding, data in variants.items()},
+        }
+    assets = {}
+    for full_path, name in sorted(asset_store.files().items()):
+        stat = os.stat(full_path)
+        assets[os.path.relpath(full_path, asset_store.root)] = (name, stat.st_mtime_ns, stat.st_size)
+
+    index = json.dumps(
+        {"pages": pages, "static": static, "assets": assets, "page_inputs": _page_inputs()}, separators=(",", ":")
+    ).encode("utf-8")
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.tmp{os.getpid()}")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(index)))
+        f.write(index)
+        for chunk in writer.chunks:
+            f.write(chunk)
+    tmp_path.replace(target)
+    size = target.stat().st_size
+    logger.info("Wrote page bundle %s: %d pages, %d static assets, %d bytes", target, len(pages), len(static), size)
+    return size
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_bundle()
@@ -0,0 +1,127 @@
+"""
+Course Catalog and Receipt IDs.
+
+The course catalog is an immutable snapshot of COURSE_PRICES (payments.py)
+with the per-course PRICE_* environment overrides already applied, built once
+at import so the order path does no environment lookups. Sending SIGHUP to the
+server rebuilds it with the PRICE_* values in .env taking precedence, so a
+price change is an edit to .env followed by `kill -HUP <pid>`; the new
+snapshot replaces the old one in a single assignment.
+
+Razorpay receipts come from ReceiptIds, which combines a millisecond
+timestamp, a host and worker tag and a per-process sequence number, so two
+orders never share a receipt even within the same millisecond or across
+server workers.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, Optional
+
+from dotenv import dotenv_values, find_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Course:
+    course_id: str
+    name: str
+    amount: int
+    currency: str
+    price_env: str
+
+
+class CourseCatalog:
+    """Read-only mapping of course ID to Course."""
+
+    def __init__(self, courses: Mapping[str, Course]):
+        self._courses = MappingProxyType(dict(courses))
+
+    def get(self, course_id: str) -> Optional[Course]:
+        return self._courses.get(course_id)
+
+    def __contains__(self, course_id: str) -> bool:
+        return course_id in self._courses
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._courses)
+
+    def __len__(self) -> int:
+        return len(self._courses)
+
+
+def build_catalog(prices: Dict[str, dict], environ: Mapping[str, str]) -> CourseCatalog:
+    """
+    Build a catalog from the COURSE_PRICES table and price overrides.
+
+    Args:
+        prices: course_id -> {'name', 'amount', 'currency', 'price_env'}.
+        environ: Variables to read each course's price_env override from.
+    """
+    courses = {}
+    for course_id, data in prices.items():
+        amount = data["amount"]
+        override = environ.get(data["price_env"])
+        if override:
+            try:
+                amount = int(override)
+            except ValueError:
+                raise ValueError(f"{data['price_env']} must be an amount in paise, got {override!r}") from None
+            logger.warning("Price override active for '%s': %s paise (env: %s)", course_id, amount, data["price_env"])
+        courses[course_id] = Course(
+            course_id=course_id,
+            name=data["name"],
+            amount=amount,
+            currency=data["currency"],
+            price_env=data["price_env"],
+        )
+    return CourseCatalog(courses)
+
+
+def load_catalog(prices: Dict[str, dict], reload: bool = False) -> CourseCatalog:
+    """Build the catalog from the process environment, re-reading .env first on reload."""
+    environ: Mapping[str, str] = os.environ
+    if reload:
+        environ = {**os.environ, **{k: v for k, v in dotenv_values(find_dotenv(usecwd=True)).items() if v}}
+    catalog = build_catalog(prices, environ)
+    if reload:
+        logger.info("Course catalog reloaded (%d courses)", len(catalog))
+    return catalog
+
+
+class ReceiptIds:
+    """
+    Generator of unique receipt IDs: <prefix>_<epoch ms>_<host><worker>_<seq>.
+
+    The sequence restarts at 0 each millisecond. If the clock steps backwards,
+    the last timestamp is kept and the sequence keeps counting, so IDs never
+    repeat within a process. The worker tag is WORKER_ID (set by the
+    production launcher) or the PID, and is read on first use, after the
+    worker has been forked.
+    """
+
+    def __init__(self, prefix: str = "rcpt"):
+        self.prefix = prefix
+        self._node: Optional[str] = None
+        self._last_ms = 0
+        self._seq = 0
+
+    def next(self) -> str:
+        if self._node is None:
+            host = hashlib.sha1(socket.gethostname().encode()).hexdigest()[:4]
+            self._node = f"{host}{os.getenv('WORKER_ID') or os.getpid()}"
+        now = time.time_ns() // 1_000_000
+        if now > self._last_ms:
+            self._last_ms, self._seq = now, 0
+        else:
+            self._seq += 1
+        return f"{self.prefix}_{self._last_ms}_{self._node}_{self._seq}"
+
+
+receipt_ids = ReceiptIds()
@@ -0,0 +1,198 @@
+"""
+Precompressed Response Variants.
+
+Builds gzip and brotli encodings of HTML pages and text assets ahead of time
+and picks the best one for a request's Accept-Encoding header, so nothing is
+compressed on the request path.
+
+Variants are cached on disk under PRECOMPRESSED_DIR (default: .precompressed/),
+keyed by the SHA-256 of the uncompressed bytes, so a restart only compresses
+files whose content actually changed. Run the offline build to fill the cache
+at maximum compression levels (the Dockerfile does this at image build time):
+
+    python -m Routes.services.compression
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PRECOMPRESSED_DIR = Path(os.getenv("PRECOMPRESSED_DIR", str(PROJECT_ROOT / ".precompressed")))
+
+# Preference order when the client accepts several encodings equally.
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Levels used when a variant is missing from the cache at startup.
+# The offline build uses the maximum levels instead.
+STARTUP_LEVELS = {"br": 5, "gzip": 6}
+BUILD_LEVELS = {"br": 11, "gzip": 9}
+
+# Bodies smaller than this are not worth a Content-Encoding header.
+MIN_COMPRESS_SIZE = 512
+
+TEXT_SUFFIXES = {".html", ".css", ".js", ".svg", ".json", ".txt", ".xml"}
+
+# Static mounts whose text assets get precompressed variants.
+STATIC_TEXT_DIRECTORIES = ("style", "Resources", "figma_reference")
+
+
+def _compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime=0 keeps the output deterministic for identical input
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def build_variants(body: bytes, digest: Optional[str] = None, levels: Dict[str, int] = STARTUP_LEVELS, force: bool = False) -> Dict[str, bytes]:
+    """
+    Return {encoding: compressed bytes} for body, reading and writing the
+    on-disk variant cache. Variants that don't make the body smaller are dropped.
+
+    Args:
+        body: Uncompressed bytes.
+        digest: SHA-256 hex digest of body, if already computed.
+        levels: Compression level per encoding for variants not found in the cache.
+        force: Recompress even if a cached variant exists.
+    """
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+
+    digest = digest or hashlib.sha256(body).hexdigest()
+    variants = {}
+    for encoding in ENCODINGS:
+        cache_path = PRECOMPRESSED_DIR / f"{digest}.{encoding}"
+        data = None
+        if not force:
+            try:
+                data = cache_path.read_bytes()
+            except OSError:
+                data = None
+        if data is None:
+            data = _compress(body, encoding, levels[encoding])
+            try:
+                PRECOMPRESSED_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_suffix(f".{encoding}.tmp{os.getpid()}")
+                tmp_path.write_bytes(data)
+                tmp_path.replace(cache_path)
+            except OSError as e:
+                logger.warning("Could not write precompressed variant %s: %s", cache_path, e)
+        if len(data) < len(body):
+            variants[encoding] = data
+    return variants
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """
+    Pick the content-coding to use for a request.
+
+    Honours q-values (including q=0 exclusions and '*'); ties are broken by
+    the server preference in ENCODINGS. Returns None for identity.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class StaticVariantStore:
+    """
+    Precompressed variants of the text assets under the static mounts,
+    keyed by absolute file path.
+    """
+
+    def __init__(self, root: Path, directories=STATIC_TEXT_DIRECTORIES):
+        self.root = root
+        self.directories = tuple(directories)
+        self._entries: Dict[str, tuple] = {}
+
+    def _text_files(self):
+        for directory in self.directories:
+            for path in sorted((self.root / directory).rglob("*")):
+                if path.suffix.lower() in TEXT_SUFFIXES and path.is_file():
+                    yield path
+
+    def preload(self, levels: Dict[str, int] = STARTUP_LEVELS, force: bool = False, skip_loaded: bool = False) -> int:
+        """
+        Compress every text asset once. Returns the number of files with variants.
+
+        With skip_loaded, files that already have an up-to-date entry (e.g.
+        from the page bundle) are not read again.
+        """
+        for path in self._text_files():
+            if skip_loaded:
+                entry = self._entries.get(os.path.realpath(path))
+                if entry is not None and entry[0] == path.stat().st_mtime_ns:
+                    continue
+            body = path.read_bytes()
+            digest = hashlib.sha256(body).hexdigest()
+            variants = build_variants(body, digest, levels=levels, force=force)
+            if variants:
+                self._entries[os.path.realpath(path)] = (path.stat().st_mtime_ns, digest, variants)
+        logger.info("Precompressed %d static text assets (%s)", len(self._entries), ", ".join(ENCODINGS))
+        return len(self._entries)
+
+    def put(self, full_path: str, mtime_ns: int, digest: str, variants: Dict[str, bytes]) -> None:
+        self._entries[full_path] = (mtime_ns, digest, variants)
+
+    def entries(self) -> Dict[str, tuple]:
+        """{full path: (mtime_ns, digest, variants)} for every compressed asset."""
+        return dict(self._entries)
+
+    def get(self, full_path: str, mtime_ns: int):
+        """
+        Return (digest, variants) for a file, or None if the file has no
+        variants or changed on disk since it was compressed.
+        """
+        entry = self._entries.get(full_path)
+        if entry is None or entry[0] != mtime_ns:
+            return None
+        return entry[1], entry[2]
+
+
+static_variants = StaticVariantStore(PROJECT_ROOT)
+
+
+def build_all() -> None:
+    """Offline build: compress every page and static text asset at maximum levels."""
+    from Routes.services.pages import registry
+
+    registry.preload(levels=BUILD_LEVELS, force=True)
+    static_variants.preload(levels=BUILD_LEVELS, force=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_all()
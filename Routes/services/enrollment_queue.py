@@ -0,0 +1,303 @@
+"""
+Durable Enrollment Job Queue.
+
+SQLite-backed queue for post-payment Graphy enrollments. Jobs survive process
+restarts and redeploys (point ENROLLMENT_QUEUE_DB at a persistent volume in
+production), are retried with exponential backoff, and are keyed on the
+Razorpay payment ID so the same payment is never enqueued twice.
+
+A fixed pool of async workers (ENROLLMENT_WORKERS) claims due jobs under a
+lease, so several server processes can share one database file: a job whose
+worker died is picked up again once its lease expires. All SQLite access runs
+on a single dedicated thread to keep disk I/O off the event loop.
+
+Command line:
+    python -m Routes.services.enrollment_queue stats
+    python -m Routes.services.enrollment_queue list [--status failed]
+    python -m Routes.services.enrollment_queue replay [PAYMENT_ID ...]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from Routes.services.metrics import enrollment_jobs
+from Routes.services.resilience import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+ENROLLMENT_QUEUE_DB = os.getenv("ENROLLMENT_QUEUE_DB", str(PROJECT_ROOT / "data" / "enrollment_queue.sqlite3"))
+ENROLLMENT_WORKERS = int(os.getenv("ENROLLMENT_WORKERS", "4"))
+ENROLLMENT_MAX_ATTEMPTS = int(os.getenv("ENROLLMENT_MAX_ATTEMPTS", "8"))
+ENROLLMENT_BACKOFF_BASE = float(os.getenv("ENROLLMENT_BACKOFF_BASE", "5"))
+ENROLLMENT_BACKOFF_MAX = float(os.getenv("ENROLLMENT_BACKOFF_MAX", "900"))
+ENROLLMENT_LEASE_SECONDS = float(os.getenv("ENROLLMENT_LEASE_SECONDS", "300"))
+
+# Upper bound on how long an idle worker sleeps before re-checking the table,
+# which picks up jobs enqueued by other processes and retries that became due.
+POLL_INTERVAL = 5.0
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enrollment_jobs (
+    payment_id   TEXT PRIMARY KEY,
+    payload      TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_run_at  REAL NOT NULL,
+    lease_until  REAL,
+    last_error   TEXT,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_enrollment_jobs_due ON enrollment_jobs (status, next_run_at);
+"""
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+class JobStore:
+    """Synchronous SQLite access. Only ever called from one thread."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, payment_id: str, payload: dict) -> bool:
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO enrollment_jobs "
+            "(payment_id, payload, status, attempts, next_run_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, 0, ?, ?, ?)",
+            (payment_id, json.dumps(payload), PENDING, now, now, now),
+        )
+        return cursor.rowcount == 1
+
+    def claim(self, lease_seconds: float) -> Optional[sqlite3.Row]:
+        """Atomically take the next due job (or one whose lease expired)."""
+        now = time.time()
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT payment_id, payload, attempts FROM enrollment_jobs "
+                "WHERE (status = ? AND next_run_at <= ?) OR (status = ? AND lease_until <= ?) "
+                "ORDER BY next_run_at LIMIT 1",
+                (PENDING, now, RUNNING, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE enrollment_jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                    "WHERE payment_id = ?",
+                    (RUNNING, now + lease_seconds, now, row["payment_id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def next_due_at(self) -> Optional[float]:
+        row = self.conn.execute(
+            "SELECT MIN(next_run_at) FROM enrollment_jobs WHERE status = ?", (PENDING,)
+        ).fetchone()
+        return row[0]
+
+    def complete(self, payment_id: str) -> None:
+        self.conn.execute(
+            "UPDATE enrollment_jobs SET status = ?, lease_until = NULL, last_error = NULL, updated_at = ? "
+            "WHERE payment_id = ?",
+            (DONE, time.time(), payment_id),
+        )
+
+    def fail(self, payment_id: str, error: str, retry_at: Optional[float]) -> None:
+        status = PENDING if retry_at is not None else FAILED
+        self.conn.execute(
+            "UPDATE enrollment_jobs SET status = ?, next_run_at = COALESCE(?, next_run_at), lease_until = NULL, "
+            "last_error = ?, updated_at = ? WHERE payment_id = ?",
+            (status, retry_at, error[:2000], time.time(), payment_id),
+        )
+
+    def replay(self, payment_ids: Optional[List[str]] = None) -> int:
+        now = time.time()
+        if payment_ids:
+            placeholders = ",".join("?" for _ in payment_ids)
+            cursor = self.conn.execute(
+                f"UPDATE enrollment_jobs SET status = ?, attempts = 0, next_run_at = ?, updated_at = ? "
+                f"WHERE status = ? AND payment_id IN ({placeholders})",
+                (PENDING, now, now, FAILED, *payment_ids),
+            )
+        else:
+            cursor = self.conn.execute(
+                "UPDATE enrollment_jobs SET status = ?, attempts = 0, next_run_at = ?, updated_at = ? WHERE status = ?",
+                (PENDING, now, now, FAILED),
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM enrollment_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def jobs(self, status: Optional[str] = None, limit: int = 100) -> List[sqlite3.Row]:
+        if status:
+            return self.conn.execute(
+                "SELECT * FROM enrollment_jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (status, limit)
+            ).fetchall()
+        return self.conn.execute("SELECT * FROM enrollment_jobs ORDER BY updated_at DESC LIMIT ?", (limit,)).fetchall()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class EnrollmentQueue:
+    """
+    Async front-end for JobStore with a pool of worker tasks.
+
+    Args:
+        handler: Coroutine called with a job's payload; raising marks the attempt failed.
+        db_path: SQLite database file.
+        workers: Number of concurrent worker tasks.
+        max_attempts: Attempts before a job is marked failed.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        db_path: str = ENROLLMENT_QUEUE_DB,
+        workers: int = ENROLLMENT_WORKERS,
+        max_attempts: int = ENROLLMENT_MAX_ATTEMPTS,
+        lease_seconds: float = ENROLLMENT_LEASE_SECONDS,
+    ):
+        self.handler = handler
+        self.store = JobStore(db_path)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def _db(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="enrollment-db")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def enqueue(self, payment_id: str, payload: dict) -> bool:
+        """Persist a job. Returns False if a job for this payment already exists."""
+        created = await self._db(self.store.enqueue, payment_id, payload)
+        if created and self._wakeup is not None:
+            self._wakeup.set()
+        return created
+
+    async def counts(self) -> Dict[str, int]:
+        return await self._db(self.store.counts)
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        await self._db(lambda: self.store.conn)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info("Enrollment queue started with %d workers (%s)", self.workers, self.store.db_path)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            await self._db(self.store.close)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _sleep_until_due(self) -> None:
+        next_due = await self._db(self.store.next_due_at)
+        timeout = POLL_INTERVAL if next_due is None else min(POLL_INTERVAL, max(0.0, next_due - time.time()))
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            try:
+                job = await self._db(self.store.claim, self.lease_seconds)
+            except Exception as e:
+                logger.error("Enrollment worker %d could not claim a job: %s", worker_id, e)
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+
+            if job is None:
+                await self._sleep_until_due()
+                continue
+
+            payment_id, attempts = job["payment_id"], job["attempts"] + 1
+            try:
+                await self.handler(json.loads(job["payload"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                retry_at = None
+                if attempts < self.max_attempts:
+                    retry_at = time.time() + backoff_delay(attempts, ENROLLMENT_BACKOFF_BASE, ENROLLMENT_BACKOFF_MAX)
+                    logger.warning("Enrollment job %s attempt %d failed, retrying: %s", payment_id, attempts, e)
+                    enrollment_jobs.inc("retry")
+                else:
+                    enrollment_jobs.inc("failed")
+                    logger.error("Enrollment job %s failed permanently after %d attempts: %s", payment_id, attempts, e)
+                await self._db(self.store.fail, payment_id, str(e), retry_at)
+            else:
+                enrollment_jobs.inc("done")
+                await self._db(self.store.complete, payment_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and replay enrollment jobs")
+    parser.add_argument("--db", default=ENROLLMENT_QUEUE_DB, help="SQLite database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="job counts by status")
+    list_parser = commands.add_parser("list", help="list recent jobs")
+    list_parser.add_argument("--status", choices=[PENDING, RUNNING, DONE, FAILED])
+    list_parser.add_argument("--limit", type=int, default=50)
+    replay_parser = commands.add_parser("replay", help="move failed jobs back to pending")
+    replay_parser.add_argument("payment_ids", nargs="*", help="only replay these payments (default: all failed)")
+    args = parser.parse_args()
+
+    store = JobStore(args.db)
+    if args.command == "stats":
+        print(json.dumps(store.counts(), indent=2))
+    elif args.command == "list":
+        for row in store.jobs(args.status, args.limit):
+            print(f"{row['payment_id']}\t{row['status']}\tattempts={row['attempts']}\t{row['last_error'] or ''}")
+    elif args.command == "replay":
+        print(f"Replayed {store.replay(args.payment_ids)} job(s)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Static Export.
+
+Writes every page in the page manifest (Routes/pageManifest.py), and the
+static files those pages reference, to a directory that a plain static server
+or CDN can serve on its own. The FastAPI process then only needs to handle
+/api/* (and /healthcheck, /metrics):
+
+    python -m Routes.services.export                # writes dist/
+    python -m Routes.services.export --output /srv/roasguy
+
+Output layout:
+
+    index.html, courses/index.html, ...   one file per page URL ("/courses")
+    assets/<hash><ext>                    the canonical /assets URLs (asset_store.py)
+    Resources/, style/, figma_reference/  the static mounts, hard-linked when possible
+    <file>.br, <file>.gz                  precompressed variants, next to every file
+                                          that has one (gzip_static / brotli_static
+                                          naming)
+    _headers.json                         URL -> file, response headers and
+                                          encoded variants, for the server or CDN
+                                          config
+
+Pages go through the same registry transforms as in the app, so the exported
+HTML, ETags and Cache-Control match what the app sends. Static servers ignore
+the ?v= query string of versioned asset URLs; that is fine, because pages are
+revalidated on every visit (Cache-Control: no-cache) and always reference the
+current files.
+
+The output directory is replaced on every run. A directory that is not empty
+and has no _headers.json is never deleted.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+from Routes.pageManifest import PAGES
+from Routes.services.asset_store import ASSET_URL_PREFIX, asset_store
+from Routes.services.compression import BUILD_LEVELS, TEXT_SUFFIXES, build_variants
+from Routes.services.http_cache import IMMUTABLE_CACHE_CONTROL, STATIC_MOUNTS, http_date, static_cache_control
+from Routes.services.pages import registry
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DIST_DIR = PROJECT_ROOT / "dist"
+MANIFEST_NAME = "_headers.json"
+
+# Content-Encoding -> file suffix of the precompressed variant
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+
+
+def page_file(url_path: str) -> str:
+    """Output file for a page URL: '/' -> 'index.html', '/courses' -> 'courses/index.html'."""
+    return f"{url_path.strip('/')}/index.html".lstrip("/")
+
+
+def _link_or_copy(source: str, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _write(target: Path, data: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+
+
+def _entry(output: Path, file: str, headers: Dict[str, str], variants: Dict[str, Tuple[bytes, Dict[str, str]]]) -> dict:
+    """Write the encoded variants of a file and return its manifest entry."""
+    encodings = {}
+    for encoding, (data, variant_headers) in variants.items():
+        variant_file = file + ENCODING_SUFFIXES[encoding]
+        _write(output / variant_file, data)
+        encodings[encoding] = {"file": variant_file, "headers": variant_headers}
+    return {"file": file, "headers": headers, "encodings": encodings}
+
+
+def export_pages(output: Path) -> Dict[str, dict]:
+    """Write every manifest page. Returns {url path: manifest entry}."""
+    entries = {}
+    for route in PAGES:
+        page = registry.get(route.key)
+        if page is None:
+            logger.warning("Skipping %s: %s not found", route.path, route.key)
+            continue
+        headers = {"Content-Type": HTML_CONTENT_TYPE, **page.headers, "Cache-Control": route.cache_control}
+        variants = {}
+        if route.compress:
+            for encoding, (data, variant_headers) in page.variants.items():
+                variants[encoding] = (data, {"Content-Type": HTML_CONTENT_TYPE, **variant_headers, "Cache-Control": route.cache_control})
+        else:
+            headers.pop("Vary", None)
+        if not route.preload:
+            for entry_headers in (headers, *(variant_headers for _, variant_headers in variants.values())):
+                entry_headers.pop("Link", None)
+        file = page_file(route.path)
+        _write(output / file, page.body)
+        entries[route.path] = _entry(output, file, headers, variants)
+    return entries
+
+
+def _static_files() -> Iterator[Tuple[str, str, bool]]:
+    """Yield (url path, full path, immutable) for every file the static mounts and /assets serve."""
+    for mount, directory in STATIC_MOUNTS.items():
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                yield f"/{mount}/{path.relative_to(directory).as_posix()}", os.path.realpath(path), False
+    for name, full_path in sorted(asset_store.names().items()):
+        yield f"{ASSET_URL_PREFIX}{name}", full_path, True
+
+
+def export_static(output: Path) -> Dict[str, dict]:
+    """Link or copy every static file and write its variants. Returns {url path: manifest entry}."""
+    entries = {}
+    for url_path, full_path, immutable in _static_files():
+        stat = os.stat(full_path)
+        with open(full_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        cache_control = IMMUTABLE_CACHE_CONTROL if immutable else static_cache_control(full_path, stat.st_mtime_ns, b"")
+        headers = {
+            "Content-Type": mimetypes.guess_type(full_path)[0] or "application/octet-stream",
+            "Content-Length": str(stat.st_size),
+            "ETag": f'"{digest[:32]}"',
+            "Last-Modified": http_date(stat.st_mtime),
+            "Cache-Control": cache_control,
+        }
+        variants = {}
+        if os.path.splitext(full_path)[1].lower() in TEXT_SUFFIXES:
+            with open(full_path, "rb") as f:
+                body = f.read()
+            for encoding, data in build_variants(body, digest, levels=BUILD_LEVELS).items():
+                variants[encoding] = (data, {
+                    **headers,
+                    "Content-Length": str(len(data)),
+                    "ETag": f'"{digest[:32]}-{encoding}"',
+                    "Content-Encoding": encoding,
+                })
+            if variants:
+                headers["Vary"] = "Accept-Encoding"
+                for _, variant_headers in variants.values():
+                    variant_headers["Vary"] = "Accept-Encoding"
+        file = url_path.lstrip("/")
+        _link_or_copy(full_path, output / file)
+        entries[url_path] = _entry(output, file, headers, variants)
+    return entries
+
+
+def export(output: Path = DIST_DIR, include_static: bool = True) -> dict:
+    """
+    Export the site to output, replacing a previous export there.
+
+    Args:
+        output: Target directory.
+        include_static: Also export the static mounts and /assets files.
+
+    Returns:
+        The header manifest that was written to output/_headers.json.
+    """
+    if output.exists():
+        if any(output.iterdir()) and not (output / MANIFEST_NAME).exists():
+            raise SystemExit(f"{output} is not empty and is not a previous export; refusing to replace it")
+        shutil.rmtree(output)
+    output.mkdir(parents=True)
+
+    if not asset_store.built:
+        asset_store.build()
+    registry.preload(levels=BUILD_LEVELS)
+
+    files = export_pages(output)
+    logger.info("Exported %d pages", len(files))
+    if include_static:
+        static = export_static(output)
+        logger.info("Exported %d static files", len(static))
+        files.update(static)
+    manifest = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "files": files}
+    (output / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export every page and static file to a directory for a static server or CDN")
+    parser.add_argument("--output", type=Path, default=DIST_DIR, help="target directory, replaced if it holds a previous export (default: dist/)")
+    parser.add_argument("--pages-only", action="store_true", help="skip the static mounts and /assets files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    manifest = export(args.output, include_static=not args.pages_only)
+    files = manifest["files"]
+    variants = sum(len(entry["encodings"]) for entry in files.values())
+    print(f"Exported {len(files)} URLs and {variants} precompressed variants to {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
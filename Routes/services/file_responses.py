@@ -0,0 +1,137 @@
+"""
+Static File Responses.
+
+FileResponse replacement for the static mounts:
+
+- small files (up to STATIC_MEMORY_CACHE_MAX_FILE bytes) are served from a
+  per-worker LRU cache of file contents (STATIC_MEMORY_CACHE_MB in total),
+  so the CSS, icons and thumbnails every page pulls in skip the disk;
+- larger files (the multi-MB GIFs and .mp4s) take Starlette's own path:
+  sent by the server through the ASGI `http.response.pathsend` extension
+  when it offers it, otherwise read in a worker thread, in 1 MiB chunks
+  instead of Starlette's 64 KB. Nothing is read on the event loop, where a
+  cold page fault would stall every other request.
+
+Range and If-Range handling (single and multipart byte ranges, 206/416) is
+inherited from Starlette, so video seeking fetches only the requested bytes.
+Multipart responses put their boundary in Content-Type and send exactly
+Content-Length bytes, which Starlette's own do not.
+
+The sends are done by overriding FileResponse's private _handle_* methods, so
+starlette is pinned in requirements.txt; tests/test_file_responses.py checks
+Range serving through a mount and must pass before starlette is bumped.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.responses import FileResponse
+from starlette.types import Send
+
+STATIC_MEMORY_CACHE_MB = int(os.getenv("STATIC_MEMORY_CACHE_MB", "32"))
+STATIC_MEMORY_CACHE_MAX_FILE = int(os.getenv("STATIC_MEMORY_CACHE_MAX_FILE", str(256 * 1024)))
+
+# Starlette reads in 64 KB chunks, one worker-thread round-trip each
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class SmallFileCache:
+    """LRU cache of small file contents, keyed by path and validated by mtime and size."""
+
+    def __init__(self, max_bytes: int = STATIC_MEMORY_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+
+    async def get(self, path: str, stat_result: os.stat_result) -> bytes:
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stat_result.st_mtime_ns and entry[1] == stat_result.st_size:
+            self._entries.move_to_end(path)
+            return entry[2]
+
+        data = await anyio.to_thread.run_sync(_read, path)
+        if entry is not None:
+            self.size -= len(self._entries.pop(path)[2])
+        if len(data) <= self.max_bytes:
+            self._entries[path] = (stat_result.st_mtime_ns, stat_result.st_size, data)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        return {"files": len(self._entries), "bytes": self.size}
+
+
+small_files = SmallFileCache()
+
+
+class StaticFileResponse(FileResponse):
+    """FileResponse sending small files from the small-file cache. Requires stat_result."""
+
+    chunk_size = READ_CHUNK_SIZE
+
+    async def _cached(self) -> Optional[bytes]:
+        """Contents of a small file (read through the cache); None for large files."""
+        if self.stat_result.st_size > STATIC_MEMORY_CACHE_MAX_FILE:
+            return None
+        return await small_files.get(str(self.path), self.stat_result)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool, send_pathsend: bool) -> None:
+        contents = None if send_header_only else await self._cached()
+        if contents is None:
+            await super()._handle_simple(send, send_header_only, send_pathsend)
+            return
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.body", "body": contents, "more_body": False})
+
+    async def _handle_single_range(self, send: Send, start: int, end: int, file_size: int, send_header_only: bool) -> None:
+        contents = None if send_header_only else await self._cached()
+        if contents is None:
+            await super()._handle_single_range(send, start, end, file_size, send_header_only)
+            return
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        await send({"type": "http.response.body", "body": memoryview(contents)[start:end], "more_body": False})
+
+    async def _handle_multiple_ranges(self, send: Send, ranges, file_size: int, send_header_only: bool) -> None:
+        boundary = os.urandom(13).hex()
+        content_length, header_generator = self.generate_multipart(
+            ranges, boundary, file_size, self.headers["content-type"]
+        )
+        # Starlette sends the boundary as Content-Range; clients look for it
+        # in the Content-Type
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(content_length)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        contents = await self._cached()
+        file = None if contents is not None else await anyio.open_file(self.path, mode="rb")
+        try:
+            for start, end in ranges:
+                await send({"type": "http.response.body", "body": header_generator(start, end), "more_body": True})
+                if file is None:
+                    await send({"type": "http.response.body", "body": memoryview(contents)[start:end], "more_body": True})
+                else:
+                    await file.seek(start)
+                    while start < end:
+                        chunk = await file.read(min(self.chunk_size, end - start))
+                        start += len(chunk)
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b"\n", "more_body": True})
+        finally:
+            if file is not None:
+                await file.aclose()
+        # Starlette adds a stray newline here, one byte beyond Content-Length
+        await send({"type": "http.response.body", "body": f"--{boundary}--\n".encode("latin-1"), "more_body": False})
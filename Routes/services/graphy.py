@@ -7,21 +7,51 @@ API Base: https://api.ongraphy.com/public/v1/
 Endpoints used:
     - POST /learners       -> Create a new learner account
     - POST /assign         -> Enroll learner in a course/package and record external payment
+
+All calls share one application-lifetime httpx.AsyncClient (opened and closed
+from the FastAPI lifespan in app.py), so enrollments reuse pooled keep-alive
+connections instead of paying DNS/TCP/TLS setup on every request. Set
+GRAPHY_HTTP2=true to negotiate HTTP/2 (requires the `h2` package).
+
+Every call goes through a per-endpoint circuit breaker and a shared adaptive
+concurrency limit (see resilience.py), so a Graphy outage fails enrollments
+fast (the enrollment queue retries them later) instead of piling up
+connections. Calls that never reached Graphy (connection failures, 429/503)
+are retried with jittered backoff, within a retry budget.
 """
 
+import asyncio
 import httpx
+import importlib.util
 import os
 import re
 import logging
-from dotenv import load_dotenv
-
-load_dotenv()
+import time
+from Routes.services.settings import settings
+from Routes.services.log_pipeline import SAMPLED
+from Routes.services.metrics import record_upstream, upstream_retries
+from Routes.services.resilience import AdaptiveLimiter, CircuitBreaker, RetryBudget, backoff_delay
 
 logger = logging.getLogger(__name__)
 
-GRAPHY_API_BASE = "https://api.ongraphy.com/public/v1"
-GRAPHY_MID = os.getenv("GRAPHY_MID")
-GRAPHY_API_KEY = os.getenv("GRAPHY_API_KEY")
+GRAPHY_API_BASE = os.getenv("GRAPHY_API_BASE", "https://api.ongraphy.com/public/v1").rstrip("/")
+GRAPHY_MID = settings.graphy_mid
+GRAPHY_API_KEY = settings.graphy_api_key
+
+GRAPHY_HTTP2 = os.getenv("GRAPHY_HTTP2", "").lower() in ("1", "true", "yes")
+GRAPHY_MAX_CONNECTIONS = int(os.getenv("GRAPHY_MAX_CONNECTIONS", "20"))
+GRAPHY_KEEPALIVE_EXPIRY = float(os.getenv("GRAPHY_KEEPALIVE_EXPIRY", "30"))
+GRAPHY_CONNECT_TIMEOUT = float(os.getenv("GRAPHY_CONNECT_TIMEOUT", "5"))
+GRAPHY_READ_TIMEOUT = float(os.getenv("GRAPHY_READ_TIMEOUT", "30"))
+GRAPHY_POOL_TIMEOUT = float(os.getenv("GRAPHY_POOL_TIMEOUT", "10"))
+
+GRAPHY_BREAKER_FAILURES = int(os.getenv("GRAPHY_BREAKER_FAILURES", "5"))
+GRAPHY_BREAKER_RECOVERY = float(os.getenv("GRAPHY_BREAKER_RECOVERY", "30"))
+GRAPHY_MIN_CONCURRENCY = int(os.getenv("GRAPHY_MIN_CONCURRENCY", "2"))
+GRAPHY_LIMIT_WAIT = float(os.getenv("GRAPHY_LIMIT_WAIT", "10"))
+GRAPHY_MAX_RETRIES = int(os.getenv("GRAPHY_MAX_RETRIES", "2"))
+GRAPHY_RETRY_RATIO = float(os.getenv("GRAPHY_RETRY_RATIO", "0.2"))
+GRAPHY_RETRY_BACKOFF = float(os.getenv("GRAPHY_RETRY_BACKOFF", "0.5"))
 
 COURSE_GRAPHY_PRODUCT_MAP = {
     "fundamentals-of-facebook-ads": os.getenv("GRAPHY_PRODUCT_FUNDAMENTALS", ""),
@@ -35,6 +65,127 @@ COURSE_GRAPHY_PRODUCT_MAP = {
 }
 
 
+_client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared Graphy client, creating it on first use."""
+    global _client
+    if _client is None:
+        http2 = GRAPHY_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("GRAPHY_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        _client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=GRAPHY_MAX_CONNECTIONS,
+                max_keepalive_connections=GRAPHY_MAX_CONNECTIONS,
+                keepalive_expiry=GRAPHY_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=GRAPHY_CONNECT_TIMEOUT,
+                read=GRAPHY_READ_TIMEOUT,
+                write=GRAPHY_READ_TIMEOUT,
+                pool=GRAPHY_POOL_TIMEOUT,
+            ),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared Graphy client. Called on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+breakers = {
+    endpoint: CircuitBreaker("graphy", endpoint, GRAPHY_BREAKER_FAILURES, GRAPHY_BREAKER_RECOVERY)
+    for endpoint in ("learners", "assign")
+}
+limiter = AdaptiveLimiter(
+    "graphy",
+    initial=GRAPHY_MAX_CONNECTIONS // 2,
+    minimum=GRAPHY_MIN_CONCURRENCY,
+    maximum=GRAPHY_MAX_CONNECTIONS,
+    wait_timeout=GRAPHY_LIMIT_WAIT,
+)
+retry_budget = RetryBudget(GRAPHY_RETRY_RATIO, max_tokens=10)
+
+# Failures where Graphy never received (or explicitly refused) the request,
+# so sending it again cannot create a duplicate learner or enrollment
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_RETRYABLE_STATUSES = (429, 503)
+
+
+def health() -> dict:
+    """Breaker and limiter state for /healthcheck."""
+    return {
+        "circuits": {endpoint: breaker.snapshot() for endpoint, breaker in breakers.items()},
+        **limiter.snapshot(),
+    }
+
+
+async def _send(endpoint: str, payload: dict) -> httpx.Response:
+    """One attempt: breaker check, concurrency slot, request, bookkeeping."""
+    breaker = breakers[endpoint]
+    probe = breaker.check()
+    try:
+        await limiter.acquire(endpoint)
+    except BaseException:
+        if probe:
+            breaker.release_probe()
+        raise
+    started = time.perf_counter()
+    try:
+        response = await get_client().post(f"{GRAPHY_API_BASE}/{endpoint}", data=payload)
+    except asyncio.CancelledError:
+        limiter.release(time.perf_counter() - started, None)
+        if probe:
+            breaker.release_probe()
+        raise
+    except Exception as e:
+        limiter.release(time.perf_counter() - started, False)
+        record_upstream("graphy", endpoint, started, e)
+        breaker.record_failure()
+        raise
+    healthy = response.status_code < 500 and response.status_code != 429
+    limiter.release(time.perf_counter() - started, healthy)
+    record_upstream("graphy", endpoint, started, response.status_code)
+    if healthy:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+    return response
+
+
+async def _post(endpoint: str, payload: dict) -> httpx.Response:
+    """POST a form payload to a Graphy endpoint, retrying requests Graphy never processed."""
+    retry_budget.deposit()
+    attempt = 0
+    while True:
+        try:
+            response = await _send(endpoint, payload)
+        except _RETRYABLE_ERRORS as e:
+            if attempt >= GRAPHY_MAX_RETRIES or not retry_budget.withdraw():
+                raise
+            reason = repr(e)
+        else:
+            if response.status_code not in _RETRYABLE_STATUSES:
+                return response
+            if attempt >= GRAPHY_MAX_RETRIES or not retry_budget.withdraw():
+                return response
+            reason = f"HTTP {response.status_code}"
+        attempt += 1
+        upstream_retries.inc("graphy", endpoint)
+        delay = backoff_delay(attempt, base=GRAPHY_RETRY_BACKOFF, cap=GRAPHY_RETRY_BACKOFF * 8)
+        logger.warning("Graphy %s attempt %d failed (%s), retrying in %.2fs", endpoint, attempt, reason, delay)
+        await asyncio.sleep(delay)
+
+
 def _sanitize_phone(phone: str) -> str:
     """
     Clean phone number to ensure single country code prefix.
@@ -81,15 +232,11 @@ async def create_learner(email: str, name: str, phone: str = "") -> dict:
         payload["mobile"] = clean_phone
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{GRAPHY_API_BASE}/learners",
-                data=payload,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
+        response = await _post("learners", payload)
 
         response_data = response.json()
-        logger.info(f"Graphy Create Learner response [{response.status_code}]: {response_data}")
+        logger.info("Graphy Create Learner response [%s]", response.status_code, extra=SAMPLED)
+        logger.debug("Graphy Create Learner response body: %s", response_data)
 
         if response.status_code == 200 and "error" not in response_data:
             return {"success": True, "data": response_data}
@@ -100,7 +247,7 @@ async def create_learner(email: str, name: str, phone: str = "") -> dict:
                 "error": f"Graphy Create Learner error: {error_msg}",
             }
     except Exception as e:
-        logger.error(f"Graphy Create Learner failed: {str(e)}")
+        logger.error("Graphy Create Learner failed: %s", e)
         return {"success": False, "error": str(e)}
 
 
@@ -130,7 +277,7 @@ async def assign_course(
 
     product_id = COURSE_GRAPHY_PRODUCT_MAP.get(course_id)
     if not product_id:
-        logger.error(f"No Graphy product ID mapped for course: {course_id}")
+        logger.error("No Graphy product ID mapped for course: %s", course_id)
         return {"success": False, "error": f"No Graphy product ID for course: {course_id}"}
 
     payload = {
@@ -147,15 +294,11 @@ async def assign_course(
         payload["phone"] = clean_phone
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{GRAPHY_API_BASE}/assign",
-                data=payload,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
+        response = await _post("assign", payload)
 
         response_data = response.json()
-        logger.info(f"Graphy Assign Course response [{response.status_code}]: {response_data}")
+        logger.info("Graphy Assign Course response [%s]", response.status_code, extra=SAMPLED)
+        logger.debug("Graphy Assign Course response body: %s", response_data)
 
         if response.status_code == 200 and "error" not in response_data:
             return {"success": True, "data": response_data}
@@ -166,7 +309,7 @@ async def assign_course(
                 "error": f"Graphy Assign Course error: {error_msg}",
             }
     except Exception as e:
-        logger.error(f"Graphy Assign Course failed: {str(e)}")
+        logger.error("Graphy Assign Course failed: %s", e)
         return {"success": False, "error": str(e)}
 
 
@@ -208,17 +351,17 @@ async def create_and_enroll_learner(
     if not learner_result.get("success"):
         error_msg = learner_result.get("error", "")
         if "mobile number is already registered" in error_msg.lower() or "phone" in error_msg.lower():
-            logger.warning(
-                f"Phone conflict for {email}, retrying learner creation without phone number."
-            )
+            logger.warning("Phone conflict for %s, retrying learner creation without phone number.", email)
+            upstream_retries.inc("graphy", "learners")
             learner_result = await create_learner(email=email, name=name, phone="")
             result["learner_response"] = learner_result
             result["learner_created"] = learner_result.get("success", False)
 
         if not learner_result.get("success"):
             logger.warning(
-                f"Graphy learner creation returned non-success for {email}: "
-                f"{learner_result.get('error')}. Attempting enrollment anyway (learner may already exist)."
+                "Graphy learner creation returned non-success for %s: %s. "
+                "Attempting enrollment anyway (learner may already exist).",
+                email, learner_result.get("error"),
             )
 
     assign_result = await assign_course(
@@ -232,11 +375,8 @@ async def create_and_enroll_learner(
     result["course_assigned"] = assign_result.get("success", False)
 
     if result["course_assigned"]:
-        logger.info(f"Graphy enrollment complete for {email} in course {course_id}")
+        logger.info("Graphy enrollment complete for %s in course %s", email, course_id)
     else:
-        logger.error(
-            f"Graphy enrollment FAILED for {email} in course {course_id}: "
-            f"{assign_result.get('error')}"
-        )
+        logger.error("Graphy enrollment FAILED for %s in course %s: %s", email, course_id, assign_result.get("error"))
 
     return result
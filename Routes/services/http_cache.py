@@ -0,0 +1,146 @@
+"""
+HTTP Caching.
+
+Validators, conditional GET and Cache-Control policy shared by the page
+registry and the static file mounts.
+
+- HTML pages carry a strong ETag (content hash) and Last-Modified and are sent
+  with `Cache-Control: no-cache`, so browsers always revalidate and get a 304
+  when nothing changed.
+- Local asset URLs in pages (/Resources, /style, /figma_reference) are
+  rewritten to content-versioned URLs (`?v=<hash>`). A static request whose
+  `v` matches the file's current hash, or any file under Resources/_extracted/
+  or Resources/_optimized/ (whose names already embed a content hash), is
+  served with `Cache-Control: public, max-age=31536000, immutable`.
+- Unversioned static requests get a short STATIC_MAX_AGE and revalidate.
+"""
+
+import hashlib
+import os
+import re
+from email.utils import formatdate, parsedate_tz, mktime_tz
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+HTML_CACHE_CONTROL = "no-cache"
+STATIC_CACHE_CONTROL = f"public, max-age={STATIC_MAX_AGE}"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# URL prefix -> directory of each static mount
+STATIC_MOUNTS = {
+    "Resources": PROJECT_ROOT / "Resources",
+    "style": PROJECT_ROOT / "style",
+    "figma_reference": PROJECT_ROOT / "figma_reference",
+}
+
+# Directories whose file names are already content hashes.
+HASHED_DIRECTORIES = (
+    os.path.realpath(PROJECT_ROOT / "Resources" / "_extracted") + os.sep,
+    os.path.realpath(PROJECT_ROOT / "Resources" / "_optimized") + os.sep,
+)
+
+VERSION_PARAM = "v"
+
+ASSET_URL_RE = re.compile(
+    r"""(?P<prefix>\b(?:src|href)\s*=\s*["']|url\(\s*["']?)"""
+    r"""(?:\.\./|/)(?P<mount>Resources|style|figma_reference)/(?P<path>[^"'()?#\s]+)"""
+)
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def is_not_modified(request_headers: Headers, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against a response's validators.
+    If-None-Match takes precedence when present (RFC 9110 13.2.2).
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        parsed = parsedate_tz(if_modified_since)
+        if parsed is not None:
+            return int(last_modified) <= mktime_tz(parsed)
+    return False
+
+
+class AssetVersions:
+    """Content hash of static files, cached by path and mtime."""
+
+    def __init__(self):
+        self._versions: Dict[str, Tuple[int, str]] = {}
+
+    def version(self, full_path: str, mtime_ns: Optional[int] = None) -> Optional[str]:
+        try:
+            if mtime_ns is None:
+                mtime_ns = os.stat(full_path).st_mtime_ns
+            cached = self._versions.get(full_path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
+            with open(full_path, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()[:12]
+        except OSError:
+            return None
+        self._versions[full_path] = (mtime_ns, digest)
+        return digest
+
+
+asset_versions = AssetVersions()
+
+
+def resolve_static_path(mount: str, path: str) -> Optional[str]:
+    """Map a static URL path onto its file, refusing paths that escape the mount."""
+    directory = STATIC_MOUNTS.get(mount)
+    if directory is None:
+        return None
+    base = os.path.realpath(directory)
+    full_path = os.path.realpath(os.path.join(base, path))
+    if os.path.commonpath([full_path, base]) != base or not os.path.isfile(full_path):
+        return None
+    return full_path
+
+
+def version_asset_urls(key: str, html: str) -> str:
+    """
+    Page registry transform: point local asset references at absolute,
+    content-versioned URLs so they can be cached as immutable.
+    """
+
+    def _replace(match: re.Match) -> str:
+        mount, path = match.group("mount"), match.group("path")
+        full_path = resolve_static_path(mount, path)
+        if full_path is None:
+            return match.group(0)
+        url = f"/{mount}/{path}"
+        if not full_path.startswith(HASHED_DIRECTORIES):
+            url = f"{url}?{VERSION_PARAM}={asset_versions.version(full_path)}"
+        return f"{match.group('prefix')}{url}"
+
+    return ASSET_URL_RE.sub(_replace, html)
+
+
+def static_cache_control(full_path: str, mtime_ns: int, query_string: bytes) -> str:
+    """Cache-Control for a static file request: immutable when the URL pins its content."""
+    if full_path.startswith(HASHED_DIRECTORIES):
+        return IMMUTABLE_CACHE_CONTROL
+    marker = f"{VERSION_PARAM}=".encode()
+    if marker in query_string:
+        for part in query_string.split(b"&"):
+            if part.startswith(marker):
+                if part[len(marker):].decode("latin-1") == asset_versions.version(full_path, mtime_ns):
+                    return IMMUTABLE_CACHE_CONTROL
+                break
+    return STATIC_CACHE_CONTROL
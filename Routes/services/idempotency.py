@@ -0,0 +1,84 @@
+"""
+Idempotent Request Cache.
+
+Bounded TTL + LRU cache of in-flight and completed results, keyed by request
+identity. The first request for a key runs the upstream call; duplicates that
+arrive while it is in flight await the same future, and duplicates that arrive
+later (within the TTL) get the cached result. Failures are not cached, so a
+retry after an error makes a fresh call.
+
+Used by /api/create-order so a double-clicked "Enroll" button creates one
+Razorpay order instead of several. The cache is per process.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+
+from Routes.services.metrics import idempotent_requests
+
+T = TypeVar("T")
+
+
+def idempotency_key(*parts: Optional[str]) -> str:
+    """Stable key for a tuple of request fields."""
+    return hashlib.sha256("\x1f".join(part or "" for part in parts).encode()).hexdigest()
+
+
+class IdempotencyCache:
+    """
+    Args:
+        name: Label for metrics.
+        ttl: Seconds a completed result is reused.
+        max_entries: Entries kept before the least recently used are evicted.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Return the result for key, calling `call` only if no live entry exists."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, future = entry
+            if not future.done():
+                idempotent_requests.inc(self.name, "coalesced")
+                return await asyncio.shield(future)
+            if expires_at > now:
+                idempotent_requests.inc(self.name, "hit")
+                self._entries.move_to_end(key)
+                return future.result()
+            del self._entries[key]
+
+        idempotent_requests.inc(self.name, "miss")
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (now + self.ttl, future)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        try:
+            result = await call()
+        except BaseException as e:
+            if self._entries.get(key, (None, None))[1] is future:
+                del self._entries[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved: there may be no coalesced waiters to see it
+                future.exception()
+            raise
+        future.set_result(result)
+        # The TTL runs from completion, not from the first request
+        if self._entries.get(key, (None, None))[1] is future:
+            self._entries[key] = (time.monotonic() + self.ttl, future)
+        return result
@@ -0,0 +1,202 @@
+"""
+Image Optimization.
+
+Offline pipeline that converts the heavy funnel images (animated GIFs, large
+PNG/JPGs) under Resources/ into WebP/AVIF at several widths and records them
+in a manifest. Animated GIFs become animated WebP. Output files are named by
+the source content hash, so they are served as immutable and byte-identical
+copies of an image in different folders share one set of variants.
+
+    python -m Routes.services.images                      # build everything
+    python -m Routes.services.images --widths 480,960     # custom widths
+
+Requires Pillow (see requirements-build.txt); the server itself only reads the
+manifest. At page load, `picture_transform` wraps every <img> whose source is
+in the manifest in a <picture> with one <source srcset> per format, for the
+pages listed in PICTURE_PAGES.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+RESOURCES_DIR = PROJECT_ROOT / "Resources"
+OPTIMIZED_DIR = RESOURCES_DIR / "_optimized"
+MANIFEST_PATH = OPTIMIZED_DIR / "manifest.json"
+
+SOURCE_DIRECTORIES = ("HomePage", "AdvHomePage", "MetaHomepage")
+SOURCE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif"}
+DEFAULT_WIDTHS = (480, 960, 1440)
+DEFAULT_FORMATS = ("avif", "webp")
+QUALITY = {"webp": 78, "avif": 55}
+# Animated frames are encoded lossier; they're what dominates page weight
+ANIMATED_QUALITY = 60
+
+FORMAT_MIME = {"avif": "image/avif", "webp": "image/webp"}
+
+# Homepage variants of each funnel (see Routes/pageManifest.py)
+PICTURE_PAGES = {
+    "components/homepage.html",
+    "components/homepage_students.html",
+    "components/homepage_business_owners.html",
+    "components/advanced_homepage_business.html",
+    "components/advanced_homepage_student.html",
+    "components/metaHomepage.html",
+}
+
+IMG_TAG_RE = re.compile(r"<img\b[^>]*?\bsrc\s*=\s*[\"'](?:\.\./|/)Resources/(?P<path>[^\"'?#]+)[\"'][^>]*>", re.IGNORECASE)
+
+
+def _encode(frames, durations, path: Path, fmt: str, animated: bool, info: dict) -> None:
+    options = {"quality": ANIMATED_QUALITY if animated else QUALITY[fmt]}
+    if fmt == "webp":
+        options["method"] = 4
+    else:
+        options["speed"] = 8
+    if animated:
+        frames[0].save(
+            path, fmt.upper(), save_all=True, append_images=frames[1:],
+            duration=durations, loop=info.get("loop", 0), **options,
+        )
+    else:
+        frames[0].save(path, fmt.upper(), **options)
+
+
+def optimize_image(source: Path, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS) -> Optional[dict]:
+    """
+    Write the WebP/AVIF variants of one image and return its manifest entry,
+    or None if no variant came out smaller than the source.
+    """
+    from PIL import Image, ImageSequence
+
+    digest = hashlib.sha256(source.read_bytes()).hexdigest()[:20]
+    OPTIMIZED_DIR.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(source) as image:
+        animated = getattr(image, "is_animated", False)
+        width, height = image.size
+        targets = sorted({w for w in widths if w < width} | {width})
+        mode = "RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB"
+        if animated:
+            originals = [frame.convert("RGBA") for frame in ImageSequence.Iterator(image)]
+            durations = [frame.info.get("duration", 100) for frame in ImageSequence.Iterator(image)]
+        else:
+            originals = [image.convert(mode)]
+            durations = []
+        info = dict(image.info)
+
+    entry = {"width": width, "height": height, "animated": animated, "sources": {}}
+    source_size = source.stat().st_size
+    for fmt in formats:
+        if animated and fmt != "webp":
+            continue
+        variants = []
+        for target in targets:
+            out_path = OPTIMIZED_DIR / f"{digest}-{target}.{fmt}"
+            if not out_path.exists():
+                size = (target, max(1, round(height * target / width)))
+                frames = originals if target == width else [f.resize(size, Image.LANCZOS) for f in originals]
+                tmp_path = out_path.with_name(f"{out_path.name}.tmp{os.getpid()}")
+                _encode(frames, durations, tmp_path, fmt, animated, info)
+                tmp_path.replace(out_path)
+            variants.append({
+                "url": f"/Resources/{out_path.relative_to(RESOURCES_DIR).as_posix()}",
+                "width": target,
+                "bytes": out_path.stat().st_size,
+            })
+        # Drop a format whose full-size variant isn't smaller than the original
+        if variants and variants[-1]["bytes"] < source_size:
+            entry["sources"][FORMAT_MIME[fmt]] = variants
+
+    return entry if entry["sources"] else None
+
+
+def build(widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, directories=SOURCE_DIRECTORIES) -> dict:
+    """Optimize every image in the source directories and write the manifest."""
+    manifest = {}
+    for directory in directories:
+        for source in sorted((RESOURCES_DIR / directory).iterdir()):
+            if source.suffix.lower() not in SOURCE_SUFFIXES:
+                continue
+            try:
+                entry = optimize_image(source, widths, formats)
+            except Exception as e:
+                logger.error("Could not optimize %s: %s", source, e)
+                continue
+            if entry is None:
+                continue
+            url = f"/Resources/{source.relative_to(RESOURCES_DIR).as_posix()}"
+            manifest[url] = entry
+            best = min(v[-1]["bytes"] for v in entry["sources"].values())
+            logger.info("%s: %d -> %d bytes (%s)", url, source.stat().st_size, best, ", ".join(entry["sources"]))
+
+    OPTIMIZED_DIR.mkdir(parents=True, exist_ok=True)
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    logger.info("Wrote %d entries to %s", len(manifest), MANIFEST_PATH)
+    return manifest
+
+
+_manifest_cache: Dict[str, object] = {"mtime_ns": None, "manifest": {}}
+
+
+def load_manifest() -> dict:
+    """Return the image manifest, re-reading it only when the file changes."""
+    try:
+        mtime_ns = MANIFEST_PATH.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if _manifest_cache["mtime_ns"] != mtime_ns:
+        _manifest_cache["manifest"] = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+        _manifest_cache["mtime_ns"] = mtime_ns
+    return _manifest_cache["manifest"]
+
+
+def _srcset(variants: List[dict]) -> str:
+    return ", ".join(f"{v['url']} {v['width']}w" for v in variants)
+
+
+def picture_transform(key: str, html: str) -> str:
+    """Page registry transform: serve manifest images through <picture>/srcset."""
+    if key not in PICTURE_PAGES:
+        return html
+    manifest = load_manifest()
+    if not manifest:
+        return html
+
+    def _replace(match: re.Match) -> str:
+        entry = manifest.get(f"/Resources/{match.group('path')}")
+        if entry is None:
+            return match.group(0)
+        sources = "".join(
+            f'<source type="{mime}" srcset="{_srcset(variants)}" />'
+            for mime, variants in entry["sources"].items()
+        )
+        # display:contents keeps the <img> laid out exactly as before
+        return f'<picture style="display:contents">{sources}{match.group(0)}</picture>'
+
+    return IMG_TAG_RE.sub(_replace, html)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build WebP/AVIF variants of funnel images")
+    parser.add_argument("--widths", default=",".join(str(w) for w in DEFAULT_WIDTHS), help="comma-separated target widths")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help="comma-separated formats (avif, webp)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    build(
+        widths=tuple(int(w) for w in args.widths.split(",") if w),
+        formats=tuple(f for f in args.formats.split(",") if f in FORMAT_MIME),
+    )
+
+
+if __name__ == "__main__":
+    main()
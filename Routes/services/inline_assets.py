@@ -0,0 +1,137 @@
+"""
+Inline Image Extraction.
+
+Most of the weight of the cart and thank-you pages is base64 `data:image/...`
+URIs embedded in the HTML, which browsers can neither cache nor share across
+pages. This module decodes them into content-hashed files under
+Resources/_extracted/ and rewrites the HTML to reference those files instead.
+Identical images on different pages hash to the same file, so they are
+downloaded once.
+
+Server mode (default, disable with EXTRACT_INLINE_IMAGES=false) runs as a page
+registry transform at startup, leaving components/ untouched. The same pass
+can be run offline:
+
+    python -m Routes.services.inline_assets            # extract + report
+    python -m Routes.services.inline_assets --rewrite  # also rewrite components/*.html in place
+
+Page layouts under components/layouts/ are processed too, since that is where
+the images of the templated pages live (see templates.py).
+
+If you use --rewrite, commit the generated Resources/_extracted/ files along
+with the HTML.
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+EXTRACTED_DIR = PROJECT_ROOT / "Resources" / "_extracted"
+EXTRACTED_URL_PREFIX = "/Resources/_extracted/"
+EXTRACT_INLINE_IMAGES = os.getenv("EXTRACT_INLINE_IMAGES", "true").lower() in ("1", "true", "yes")
+
+# Data URIs smaller than this stay inline; an extra request costs more than it saves.
+MIN_EXTRACT_SIZE = 2048
+
+DATA_URI_RE = re.compile(r"data:(image/[a-z0-9.+-]+);base64,([A-Za-z0-9+/=]+)")
+
+MIME_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/svg+xml": ".svg",
+}
+
+
+def extract_inline_images(html: str) -> Tuple[str, Dict[str, bytes]]:
+    """
+    Replace base64 image data URIs in html with /Resources/_extracted/ URLs.
+
+    Returns:
+        (rewritten html, {filename: decoded bytes}) for every extracted image.
+    """
+    blobs: Dict[str, bytes] = {}
+
+    def _replace(match: re.Match) -> str:
+        mime, payload = match.group(1), match.group(2)
+        extension = MIME_EXTENSIONS.get(mime)
+        if extension is None or len(payload) < MIN_EXTRACT_SIZE:
+            return match.group(0)
+        try:
+            data = base64.b64decode(payload, validate=True)
+        except (binascii.Error, ValueError):
+            return match.group(0)
+        filename = f"{hashlib.sha256(data).hexdigest()[:20]}{extension}"
+        blobs[filename] = data
+        return f"{EXTRACTED_URL_PREFIX}{filename}"
+
+    return DATA_URI_RE.sub(_replace, html), blobs
+
+
+def write_extracted(blobs: Dict[str, bytes], directory: Path = EXTRACTED_DIR) -> int:
+    """Write extracted images that don't exist yet. Returns the number of new files."""
+    written = 0
+    for filename, data in blobs.items():
+        path = directory / filename
+        if path.exists():
+            continue
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{filename}.tmp{os.getpid()}")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        written += 1
+    return written
+
+
+def extract_transform(key: str, html: str) -> str:
+    """Page registry transform: extract inline images from component pages."""
+    if not key.startswith("components/"):
+        return html
+    rewritten, blobs = extract_inline_images(html)
+    if not blobs:
+        return html
+    try:
+        write_extracted(blobs)
+    except OSError as e:
+        logger.warning("Could not write extracted images for %s, serving inline: %s", key, e)
+        return html
+    return rewritten
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract inline base64 images from components/*.html")
+    parser.add_argument("--rewrite", action="store_true", help="rewrite components/*.html in place")
+    args = parser.parse_args()
+
+    seen: Dict[str, int] = {}
+    components = PROJECT_ROOT / "components"
+    for path in sorted(components.glob("*.html")) + sorted(components.glob("layouts/*.html")):
+        html = path.read_text(encoding="utf-8")
+        rewritten, blobs = extract_inline_images(html)
+        if not blobs:
+            continue
+        write_extracted(blobs)
+        shared = sum(1 for name in blobs if name in seen)
+        for name, data in blobs.items():
+            seen[name] = len(data)
+        print(f"{path.name}: {len(html.encode())} -> {len(rewritten.encode())} bytes, {len(blobs)} images ({shared} shared)")
+        if args.rewrite:
+            path.write_text(rewritten, encoding="utf-8")
+
+    print(f"{len(seen)} unique images, {sum(seen.values())} bytes in {EXTRACTED_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Logging Pipeline.
+
+Application logs are handed to a background thread instead of being written
+from the event loop. configure_logging() replaces the root handlers with a
+QueueHandler; a QueueListener thread formats each record and writes it to
+stderr. A log call on the request path therefore only creates the record and
+puts it on a queue: message formatting, redaction, JSON encoding and the write
+itself all happen on the listener thread.
+
+- Output is one JSON object per line (LOG_FORMAT=json, the default) or the
+  plain "LEVEL:logger:message" format (LOG_FORMAT=text).
+- Email addresses and phone numbers are masked in every message and
+  traceback (a***@example.com, ******3210).
+- High-volume INFO lines, marked with `extra=SAMPLED`, and uvicorn access
+  logs are kept with probability LOG_SAMPLE_RATE (default 1, keep all).
+  Warnings and errors are never sampled.
+
+Each forked server worker gets its own queue and listener thread; call
+stop_logging() before os._exit() so queued records are written.
+
+Settings (environment):
+    LOG_LEVEL          root log level (default INFO)
+    LOG_FORMAT         json or text (default json)
+    LOG_SAMPLE_RATE    fraction of sampled INFO records kept (default 1)
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+
+# Pass as `extra=SAMPLED` on per-request INFO lines that may be sampled
+SAMPLED = {"sampled": True}
+SAMPLED_LOGGERS = ("uvicorn.access",)
+
+_EMAIL = re.compile(r"([A-Za-z0-9._%+-])[A-Za-z0-9._%+-]*@([A-Za-z0-9.-]+\.[A-Za-z]{2,})")
+# 10-15 digits, optionally with a leading + and single spaces or dashes, not
+# part of a longer identifier (receipt and payment IDs contain long numbers)
+_PHONE = re.compile(r"(?<![\w+])\+?\d(?:[ -]?\d){5,10}([ -]?\d{4})(?!\w)")
+
+
+def redact(text: str) -> str:
+    """Mask email addresses and phone numbers in text."""
+    text = _EMAIL.sub(r"\1***@\2", text)
+    return _PHONE.sub(lambda m: "******" + m.group(1).lstrip(" -"), text)
+
+
+class SamplingFilter(logging.Filter):
+    """Drops a fraction of sampled INFO-and-below records."""
+
+    def __init__(self, rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno > logging.INFO:
+            return True
+        if getattr(record, "sampled", False) or record.name in SAMPLED_LOGGERS:
+            return random.random() < self.rate
+        return True
+
+
+class _RedactingFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message, pid, worker, exc_info."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+            "pid": record.process,
+        }
+        worker = os.getenv("WORKER_ID")
+        if worker is not None:
+            entry["worker"] = worker
+        if record.exc_info:
+            entry["exc_info"] = redact(self.formatException(record.exc_info))
+        elif record.exc_text:
+            entry["exc_info"] = redact(record.exc_text)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _InProcessQueueHandler(QueueHandler):
+    # The stock prepare() formats the message (and traceback) on the calling
+    # thread so the record can be pickled; the queue never leaves this
+    # process, so the record is passed through and formatted by the listener.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_handler: Optional[_InProcessQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def _output_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stderr)
+    if LOG_FORMAT == "text":
+        handler.setFormatter(_RedactingFormatter(logging.BASIC_FORMAT))
+    else:
+        handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _start_listener() -> None:
+    global _listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _handler.queue = log_queue
+    _listener = QueueListener(log_queue, _output_handler())
+    _listener.start()
+
+
+def _after_fork() -> None:
+    # The parent's listener thread does not exist in the child, and its queue
+    # may have been locked mid-operation at the fork; start over with new ones.
+    global _listener
+    if _handler is not None:
+        _listener = None
+        _start_listener()
+
+
+def configure_logging() -> None:
+    """Route all logging through the queue. Replaces any existing root handlers; safe to call twice."""
+    global _handler
+    if _handler is not None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    _handler = _InProcessQueueHandler(queue.SimpleQueue())
+    _handler.addFilter(SamplingFilter())
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    _start_listener()
+    atexit.register(stop_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_after_fork)
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
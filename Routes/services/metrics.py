@@ -0,0 +1,243 @@
+"""
+Prometheus Metrics.
+
+Minimal in-process counters, gauges and histograms rendered in the Prometheus
+text exposition format by GET /metrics (Routes/metrics.py).
+
+Metrics are only ever updated from the event loop thread, so updates are plain
+integer/float increments on per-label-set lists: no locks and no allocation
+once a label set has been seen. Histograms store per-bucket counts and
+accumulate them only when scraped. Each server worker process keeps its own
+metrics, so with several workers a scrape reports the worker that answered it.
+
+Recorded:
+    - http_requests_total, http_request_duration_seconds,
+      http_response_size_bytes    per method / route template / status
+    - http_requests_in_flight
+    - upstream_requests_total, upstream_request_duration_seconds
+                                  Graphy and Razorpay calls by operation and outcome
+    - upstream_retries_total      retried upstream calls
+    - upstream_rejected_total     calls refused by a circuit breaker or
+                                  concurrency limiter (resilience.py)
+    - upstream_circuit_state      0 closed, 1 half-open, 2 open
+    - upstream_concurrency_limit  current adaptive concurrency limit
+    - enrollment_jobs_total       enrollment attempts by outcome
+    - enrollment_queue_jobs       enrollment jobs by status (refreshed on scrape)
+    - idempotent_requests_total   deduplicated requests by cache outcome
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Request methods used as label values; any other is labelled "other" so
+# arbitrary client methods can't add series
+METHOD_LABELS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        REGISTRY.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        cell = self._values.get(labels)
+        if cell is None:
+            cell = self._values[labels] = [0]
+        cell[0] += amount
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, cell in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(cell[0])}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = [value]
+
+    def clear(self) -> None:
+        self._values = {}
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one count per bucket, then +Inf, sum, count
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        cell = self._values.get(labels)
+        if cell is None:
+            cell = self._values[labels] = [0] * (len(self.buckets) + 3)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        bounds = self.buckets + (float("inf"),)
+        for labels, cell in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, cell):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(cell[-2])}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(cell[-1])}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+http_requests = Counter("http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+http_duration = Histogram("http_request_duration_seconds", "HTTP request duration.", ("method", "route"))
+http_response_size = Histogram("http_response_size_bytes", "HTTP response body size.", ("route",), SIZE_BUCKETS)
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+upstream_requests = Counter("upstream_requests_total", "Calls to third-party APIs.", ("service", "operation", "outcome"))
+upstream_duration = Histogram("upstream_request_duration_seconds", "Third-party API call duration.", ("service", "operation"))
+upstream_retries = Counter("upstream_retries_total", "Third-party API calls that were retried.", ("service", "operation"))
+upstream_rejected = Counter(
+    "upstream_rejected_total", "Third-party API calls refused before being sent.", ("service", "operation", "reason")
+)
+upstream_circuit_state = Gauge(
+    "upstream_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", ("service", "operation")
+)
+upstream_concurrency_limit = Gauge("upstream_concurrency_limit", "Adaptive concurrency limit.", ("service",))
+enrollment_jobs = Counter("enrollment_jobs_total", "Enrollment job attempts.", ("outcome",))
+enrollment_queue_jobs = Gauge("enrollment_queue_jobs", "Enrollment jobs by status.", ("status",))
+idempotent_requests = Counter(
+    "idempotent_requests_total", "Idempotent requests by cache outcome (miss, hit, coalesced).", ("name", "outcome")
+)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def record_upstream(service: str, operation: str, started: float, result) -> None:
+    """
+    Record one third-party call.
+
+    Args:
+        service: 'graphy' or 'razorpay'.
+        operation: Endpoint name, e.g. 'assign'.
+        started: time.perf_counter() when the call began.
+        result: The HTTP status code, or the exception the call raised.
+    """
+    upstream_duration.observe(time.perf_counter() - started, service, operation)
+    if isinstance(result, int):
+        outcome = str(result)
+    elif isinstance(result, httpx.TimeoutException):
+        outcome = "timeout"
+    else:
+        outcome = "error"
+    upstream_requests.inc(service, operation, outcome)
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Static mounts set root_path to the mount prefix
+    root_path = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+    if root_path:
+        return f"{root_path}/{{path}}"
+    # Unmatched paths share one label so 404 scans can't blow up cardinality
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording duration, size and status per route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+        content_length: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size, content_length
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-length":
+                        content_length = int(value)
+                        break
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            route = _route_template(scope)
+            method = scope["method"] if scope["method"] in METHOD_LABELS else "other"
+            http_duration.observe(time.perf_counter() - started, method, route)
+            http_response_size.observe(content_length if content_length is not None else size, route)
+            http_requests.inc(method, route, str(status))
@@ -0,0 +1,153 @@
+"""
+Page Routes.
+
+Serves every HTML page listed in the page manifest (Routes/pageManifest.py)
+through one Starlette route. Matching a request is a single dict lookup on the
+URL path, instead of a regex match against each page route in turn, and the
+response for each (page, encoding) pair is compiled once into its final body
+and raw header list, so serving a page is two ASGI sends straight from memory.
+
+Each manifest entry can set its own Cache-Control and opt out of compression
+or of the page's preload Link header. Where the ASGI server supports the
+http.response.early_hint extension, those links are also sent as a 103 Early
+Hints response ahead of the page (see preload.py).
+Compiled responses are rebuilt automatically when the page registry reloads a
+page (PAGE_CACHE_CHECK_MTIME).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import HTMLResponse, PlainTextResponse
+from starlette.routing import BaseRoute, Match, NoMatchFound, get_route_path
+from starlette.types import Receive, Scope, Send
+
+from Routes.services.compression import negotiate
+from Routes.services.http_cache import HTML_CACHE_CONTROL, is_not_modified
+from Routes.services.pages import Body, Page, PageRegistry, registry
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+METHODS = ("GET", "HEAD")
+
+
+@dataclass(frozen=True)
+class PageRoute:
+    """One manifest entry: a URL served from a page in the registry."""
+
+    path: str
+    key: str
+    missing_message: str = "Page not found"
+    cache_control: str = HTML_CACHE_CONTROL
+    compress: bool = True
+    preload: bool = True
+
+
+@dataclass(frozen=True)
+class _Compiled:
+    body: Body
+    etag: str
+    headers: RawHeaders
+    not_modified_headers: RawHeaders
+    early_hints: Tuple[bytes, ...]
+
+
+def _compile(route: PageRoute, page: Page) -> Dict[Optional[str], _Compiled]:
+    choices = {None: (page.body, page.headers)}
+    if route.compress:
+        choices.update(page.variants)
+    compiled = {}
+    for encoding, (body, headers) in choices.items():
+        headers = {**headers, "Cache-Control": route.cache_control}
+        if not route.compress:
+            headers.pop("Vary", None)
+        if not route.preload:
+            headers.pop("Link", None)
+        raw = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+        compiled[encoding] = _Compiled(
+            body=body,
+            etag=headers["ETag"],
+            headers=[(b"content-type", b"text/html; charset=utf-8"), *raw],
+            not_modified_headers=[header for header in raw if header[0] != b"content-length"],
+            early_hints=tuple(link.encode("latin-1") for link in page.links) if route.preload else (),
+        )
+    return compiled
+
+
+class PageTable(BaseRoute):
+    """
+    Route matching every manifest URL by exact path.
+
+    Args:
+        pages: Manifest entries.
+        page_registry: Registry the pages are loaded from.
+    """
+
+    def __init__(self, pages: Iterable[PageRoute], page_registry: PageRegistry = registry):
+        self.registry = page_registry
+        self.routes: Dict[str, PageRoute] = {}
+        for route in pages:
+            if route.path in self.routes:
+                raise ValueError(f"Duplicate page route: {route.path}")
+            self.routes[route.path] = route
+        self._compiled: Dict[str, Tuple[Page, Dict[Optional[str], _Compiled]]] = {}
+
+    def compile(self) -> int:
+        """Build the response for every route up front. Returns the number compiled."""
+        for route in self.routes.values():
+            self._lookup(route)
+        return len(self._compiled)
+
+    def _lookup(self, route: PageRoute) -> Optional[Tuple[Page, Dict[Optional[str], _Compiled]]]:
+        page = self.registry.get(route.key)
+        if page is None:
+            return None
+        cached = self._compiled.get(route.path)
+        if cached is None or cached[0] is not page:
+            cached = self._compiled[route.path] = (page, _compile(route, page))
+        return cached
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        if scope["type"] != "http":
+            return Match.NONE, {}
+        route = self.routes.get(get_route_path(scope))
+        if route is None:
+            return Match.NONE, {}
+        # `route` carries the path template for MetricsMiddleware
+        child_scope = {"endpoint": self.handle, "route": route}
+        return (Match.FULL if scope["method"] in METHODS else Match.PARTIAL), child_scope
+
+    def url_path_for(self, name: str, /, **path_params) -> None:
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["method"] not in METHODS:
+            headers = {"Allow": ", ".join(METHODS)}
+            if "app" in scope:
+                raise HTTPException(status_code=405, headers=headers)
+            await PlainTextResponse("Method Not Allowed", status_code=405, headers=headers)(scope, receive, send)
+            return
+
+        route: PageRoute = scope["route"]
+        found = self._lookup(route)
+        if found is None:
+            response = HTMLResponse(content=f"<html><body><h1>{route.missing_message}</h1></body></html>")
+            await response(scope, receive, send)
+            return
+
+        page, compiled = found
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding"), page.variants) if route.compress else None
+        response = compiled[encoding]
+
+        if is_not_modified(request_headers, response.etag, page.mtime_ns / 1e9):
+            await send({"type": "http.response.start", "status": 304, "headers": response.not_modified_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if response.early_hints and "http.response.early_hint" in scope.get("extensions", {}):
+            await send({"type": "http.response.early_hint", "links": response.early_hints})
+        await send({"type": "http.response.start", "status": 200, "headers": response.headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else response.body})
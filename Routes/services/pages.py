@@ -0,0 +1,191 @@
+"""
+Page Registry.
+
+Loads every HTML page under components/ and figma_reference/ once into memory
+as pre-encoded bytes with a precomputed ETag and Content-Length, so route
+handlers never touch the disk on the request path. Each page also carries its
+gzip/brotli variants (see compression.py), chosen per request from the
+Accept-Encoding header.
+
+Pages pass through a list of transforms (key, html) -> html when they are
+loaded, e.g. to move inline images out into cacheable files or to version
+asset URLs; the ETag and the compressed variants are computed from the
+transformed output. Pages are served by the PageTable route (page_routes.py).
+
+A page file may instead extend a shared layout under components/layouts/ (see
+templates.py); it is rendered once here, before the transforms, and its
+Last-Modified and mtime check cover both the page and its layout.
+
+Each page is also scanned for its critical stylesheets, scripts and
+preconnects, which are sent as a Link header (see preload.py).
+
+Set PAGE_CACHE_CHECK_MTIME=true in development to have the registry stat the
+source file on each lookup and reload it when it changes on disk.
+"""
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from Routes.services.asset_store import canonical_asset_urls
+from Routes.services.compression import STARTUP_LEVELS, build_variants, negotiate
+from Routes.services.http_cache import HTML_CACHE_CONTROL, http_date, version_asset_urls
+from Routes.services.images import picture_transform
+from Routes.services.inline_assets import EXTRACT_INLINE_IMAGES, extract_transform
+from Routes.services.preload import resource_hints
+from Routes.services.templates import load_page, page_mtime_ns
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PAGE_DIRECTORIES = ("components", "figma_reference")
+CHECK_MTIME = os.getenv("PAGE_CACHE_CHECK_MTIME", "").lower() in ("1", "true", "yes")
+
+PageTransform = Callable[[str, str], str]
+# Pages loaded from the page bundle (bundle.py) hold memoryviews into its mmap
+Body = Union[bytes, memoryview]
+
+
+@dataclass(frozen=True)
+class Page:
+    """An immutable, fully encoded HTML page ready to be written to the socket."""
+
+    key: str
+    body: Body
+    etag: str
+    mtime_ns: int
+    headers: Dict[str, str]
+    variants: Dict[str, Tuple[Body, Dict[str, str]]]
+    # Link header values of the page's critical subresources (preload.py)
+    links: Tuple[str, ...] = ()
+
+    @property
+    def content_length(self) -> int:
+        return len(self.body)
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Body, Dict[str, str]]:
+        """Return (body, headers) for the best encoding the client accepts."""
+        encoding = negotiate(accept_encoding, self.variants)
+        if encoding is None:
+            return self.body, self.headers
+        return self.variants[encoding]
+
+
+def _build_page(
+    key: str,
+    path: Path,
+    transforms: List[PageTransform] = (),
+    levels: Dict[str, int] = STARTUP_LEVELS,
+    force: bool = False,
+    root: Path = PROJECT_ROOT,
+) -> Page:
+    source = load_page(key, path, root)
+    body = source.body
+    html = body.decode("utf-8")
+    if transforms:
+        for transform in transforms:
+            html = transform(key, html)
+        body = html.encode("utf-8")
+    links = resource_hints(html)
+    digest = hashlib.sha256(body).hexdigest()
+    etag = f'"{digest[:32]}"'
+    compressed = build_variants(body, digest, levels=levels, force=force)
+
+    headers = {
+        "ETag": etag,
+        "Content-Length": str(len(body)),
+        "Last-Modified": http_date(source.mtime_ns / 1e9),
+        "Cache-Control": HTML_CACHE_CONTROL,
+    }
+    if links:
+        headers["Link"] = ", ".join(links)
+    if compressed:
+        headers["Vary"] = "Accept-Encoding"
+
+    variants = {}
+    for encoding, data in compressed.items():
+        variants[encoding] = (data, {
+            **headers,
+            "ETag": f'"{digest[:32]}-{encoding}"',
+            "Content-Length": str(len(data)),
+            "Content-Encoding": encoding,
+        })
+    return Page(key=key, body=body, etag=etag, mtime_ns=source.mtime_ns, headers=headers, variants=variants, links=links)
+
+
+class PageRegistry:
+    """
+    In-memory cache of every HTML page, keyed by its path relative to the
+    project root (e.g. 'components/cartPage.html').
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        directories=PAGE_DIRECTORIES,
+        check_mtime: bool = CHECK_MTIME,
+        transforms: Optional[List[PageTransform]] = None,
+    ):
+        self.root = root
+        self.directories = tuple(directories)
+        self.check_mtime = check_mtime
+        self.transforms = list(transforms or [])
+        self._pages: Dict[str, Page] = {}
+
+    def preload(self, levels: Dict[str, int] = STARTUP_LEVELS, force: bool = False, skip_loaded: bool = False) -> int:
+        """
+        Load every *.html file in the page directories. Returns the page count.
+
+        With skip_loaded, pages already in the registry (e.g. from the page
+        bundle) are kept as they are.
+        """
+        for directory in self.directories:
+            for path in sorted((self.root / directory).glob("*.html")):
+                key = f"{directory}/{path.name}"
+                if skip_loaded and key in self._pages:
+                    continue
+                self._pages[key] = _build_page(key, path, self.transforms, levels=levels, force=force, root=self.root)
+        total = sum(page.content_length for page in self._pages.values())
+        logger.info("Page registry loaded %d pages (%d bytes)", len(self._pages), total)
+        return len(self._pages)
+
+    def get(self, key: str) -> Optional[Page]:
+        """Return the cached page for key, loading it on first use. None if missing."""
+        page = self._pages.get(key)
+        if page is not None and not self.check_mtime:
+            return page
+
+        path = self.root / key
+        try:
+            if page is not None and page_mtime_ns(path, self.root) == page.mtime_ns:
+                return page
+            page = _build_page(key, path, self.transforms, root=self.root)
+        except FileNotFoundError:
+            self._pages.pop(key, None)
+            return None
+
+        self._pages[key] = page
+        return page
+
+    def pages(self) -> Dict[str, Page]:
+        return dict(self._pages)
+
+    def put(self, page: Page) -> None:
+        """Add a page built elsewhere (see bundle.py)."""
+        self._pages[page.key] = page
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+
+_transforms: List[PageTransform] = []
+if EXTRACT_INLINE_IMAGES:
+    _transforms.append(extract_transform)
+_transforms.append(picture_transform)
+_transforms.append(canonical_asset_urls)
+_transforms.append(version_asset_urls)
+
+registry = PageRegistry(PROJECT_ROOT, transforms=_transforms)
@@ -0,0 +1,102 @@
+"""
+Resource Hints.
+
+The stylesheets, fonts and scripts a funnel page needs (cartPage.css, Google
+Fonts, Razorpay's checkout.js, script.js and cart.js) are only requested once
+the browser has parsed far enough into the HTML to find them. Every page is
+therefore scanned when the registry builds it, and the page is sent with a
+Link header listing those subresources:
+
+- <link rel="preconnect"> and <link rel="preload"> tags are repeated as is.
+- Stylesheets become rel=preload; as=style.
+- Scripts with a src become rel=preload; as=script.
+
+With the header, the browser starts fetching them while the body is still
+arriving. When the ASGI server supports the http.response.early_hint
+extension, PageTable also sends the links as a 103 Early Hints response
+before the page. uvicorn does not support it yet; hypercorn and CDNs that
+turn Link headers into Early Hints do.
+
+Hints use the page's final URLs (versioned, /assets/...), so the preloaded
+responses are the ones the page then uses. A manifest entry can opt out with
+PageRoute(preload=False). To print the Link values per route:
+
+    python -m Routes.services.preload
+"""
+
+import argparse
+import html
+import json
+import re
+from typing import Dict, List, Tuple
+from urllib.parse import quote
+
+# Characters left as they are when a URL is put into a Link header
+_URL_SAFE = ":/?#@!$&'()*+,;=%~-._"
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_TAG_RE = re.compile(r"<(link|script)\b([^>]*)>", re.IGNORECASE)
+_ATTRIBUTE_RE = re.compile(r"""([\w:-]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+))?""")
+
+# Upper bound on hints per page; each one is a request the browser starts
+MAX_HINTS = 12
+
+
+def _attributes(text: str) -> Dict[str, str]:
+    attributes = {}
+    for name, value in _ATTRIBUTE_RE.findall(text):
+        if value[:1] in ("'", '"'):
+            value = value[1:-1]
+        attributes[name.lower()] = html.unescape(value)
+    return attributes
+
+
+def _link(url: str, *params: str) -> str:
+    return "; ".join([f"<{quote(url, safe=_URL_SAFE)}>", *params])
+
+
+def resource_hints(page_html: str) -> Tuple[str, ...]:
+    """Link header values for the critical subresources of a page, in document order."""
+    hints: List[str] = []
+    for tag, text in _TAG_RE.findall(_COMMENT_RE.sub("", page_html)):
+        attributes = _attributes(text)
+        crossorigin = ("crossorigin",) if "crossorigin" in attributes else ()
+        if tag.lower() == "script":
+            if attributes.get("src"):
+                hints.append(_link(attributes["src"], "rel=preload", "as=script", *crossorigin))
+            continue
+        href = attributes.get("href")
+        rel = attributes.get("rel", "").lower().split()
+        if not href:
+            continue
+        if "preconnect" in rel:
+            hints.append(_link(href, "rel=preconnect", *crossorigin))
+        elif "preload" in rel and attributes.get("as"):
+            extra = (f'type="{attributes["type"]}"',) if attributes.get("type") else ()
+            hints.append(_link(href, "rel=preload", f"as={attributes['as']}", *extra, *crossorigin))
+        elif "stylesheet" in rel:
+            hints.append(_link(href, "rel=preload", "as=style", *crossorigin))
+    return tuple(dict.fromkeys(hints))[:MAX_HINTS]
+
+
+def preload_manifest() -> Dict[str, List[str]]:
+    """{route path: Link values} for every manifest page that sends hints."""
+    from Routes.pageManifest import PAGES
+    from Routes.services.pages import registry
+
+    manifest = {}
+    for route in PAGES:
+        page = registry.get(route.key)
+        if route.preload and page is not None and page.links:
+            manifest[route.path] = list(page.links)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print the preload Link values of every page route as JSON")
+    parser.parse_args()
+    print(json.dumps(preload_manifest(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Processed Payments Index.
+
+Record of every payment /api/verify-payment has accepted, so a repeated
+verification of the same payment (client retries, a refreshed checkout)
+returns the original result without recomputing the signature or touching the
+enrollment queue again.
+
+Entries are persisted to SQLite (PROCESSED_PAYMENTS_DB) and loaded into a dict
+at startup, so lookups are O(1) in memory. A cached result is only returned
+when the request carries the same order ID and signature as the one that was
+verified; anything else goes through full verification. Several server
+processes can share the database file: a payment recorded by another worker
+after startup is simply verified again, and recording it is idempotent.
+"""
+
+import asyncio
+import hmac
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PROCESSED_PAYMENTS_DB = os.getenv(
+    "PROCESSED_PAYMENTS_DB", str(PROJECT_ROOT / "data" / "processed_payments.sqlite3")
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_payments (
+    payment_id   TEXT PRIMARY KEY,
+    order_id     TEXT NOT NULL,
+    signature    TEXT NOT NULL,
+    created_at   REAL NOT NULL
+);
+"""
+
+
+class ProcessedPayments:
+    """
+    Args:
+        db_path: SQLite database file.
+    """
+
+    def __init__(self, db_path: str = PROCESSED_PAYMENTS_DB):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # payment_id -> (order_id, signature)
+        self._payments: Dict[str, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._payments)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _db(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="processed-payments-db")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _load(self) -> None:
+        rows = self.conn.execute("SELECT payment_id, order_id, signature FROM processed_payments").fetchall()
+        self._payments = {payment_id: (order_id, signature) for payment_id, order_id, signature in rows}
+
+    def _insert(self, payment_id: str, order_id: str, signature: str) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO processed_payments (payment_id, order_id, signature, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (payment_id, order_id, signature, time.time()),
+        )
+
+    async def load(self) -> None:
+        """Read every processed payment into memory."""
+        await self._db(self._load)
+        logger.info("Loaded %d processed payments (%s)", len(self._payments), self.db_path)
+
+    def is_processed(self, payment_id: str, order_id: str, signature: str) -> bool:
+        """True if this exact (payment, order, signature) was already verified."""
+        entry = self._payments.get(payment_id)
+        if entry is None:
+            return False
+        return entry[0] == order_id and hmac.compare_digest(entry[1].encode(), signature.encode())
+
+    async def record(self, payment_id: str, order_id: str, signature: str) -> None:
+        """Persist a verified payment and add it to the in-memory index."""
+        await self._db(self._insert, payment_id, order_id, signature)
+        self._payments[payment_id] = (order_id, signature)
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            await self._db(self._close)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
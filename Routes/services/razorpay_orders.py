@@ -0,0 +1,125 @@
+"""
+Razorpay Orders Client.
+
+Async replacement for `razorpay.Client().order.create`, which is a blocking
+`requests` call and would stall the event loop for the whole round-trip.
+Uses one pooled httpx.AsyncClient for the application lifetime; the pool size
+bounds how many order requests can be in flight at once, and a request that
+can't get a connection within the pool timeout fails instead of queueing
+forever.
+
+API Base: https://api.razorpay.com/v1 (override with RAZORPAY_API_BASE, e.g. to
+point at a local stub server).
+
+Endpoints used:
+    - POST /orders         -> Create an order
+"""
+
+import logging
+import os
+import time
+from typing import Optional
+
+import httpx
+
+from Routes.services.metrics import record_upstream
+
+logger = logging.getLogger(__name__)
+
+RAZORPAY_API_BASE = os.getenv("RAZORPAY_API_BASE", "https://api.razorpay.com/v1").rstrip("/")
+RAZORPAY_MAX_CONCURRENCY = int(os.getenv("RAZORPAY_MAX_CONCURRENCY", "20"))
+RAZORPAY_CONNECT_TIMEOUT = float(os.getenv("RAZORPAY_CONNECT_TIMEOUT", "5"))
+RAZORPAY_READ_TIMEOUT = float(os.getenv("RAZORPAY_READ_TIMEOUT", "15"))
+RAZORPAY_POOL_TIMEOUT = float(os.getenv("RAZORPAY_POOL_TIMEOUT", "5"))
+
+
+class RazorpayError(Exception):
+    """Raised when Razorpay answers with a non-2xx status."""
+
+    def __init__(self, status_code: int, code: str, description: str):
+        super().__init__(f"{code}: {description}")
+        self.status_code = status_code
+        self.code = code
+        self.description = description
+
+
+class RazorpayOrdersClient:
+    """
+    Minimal async Razorpay orders client sharing one pooled connection.
+
+    Args:
+        key_id: Razorpay key ID (basic auth username).
+        key_secret: Razorpay key secret (basic auth password).
+        base_url: API base URL.
+        max_concurrency: Maximum simultaneous connections to Razorpay.
+    """
+
+    def __init__(
+        self,
+        key_id: Optional[str],
+        key_secret: Optional[str],
+        base_url: str = RAZORPAY_API_BASE,
+        max_concurrency: int = RAZORPAY_MAX_CONCURRENCY,
+    ):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.key_id or "", self.key_secret or ""),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                timeout=httpx.Timeout(
+                    connect=RAZORPAY_CONNECT_TIMEOUT,
+                    read=RAZORPAY_READ_TIMEOUT,
+                    write=RAZORPAY_READ_TIMEOUT,
+                    pool=RAZORPAY_POOL_TIMEOUT,
+                ),
+            )
+        return self._client
+
+    async def create_order(self, data: dict) -> dict:
+        """
+        Create a Razorpay order.
+
+        Args:
+            data: Order payload (amount, currency, receipt, notes).
+
+        Returns:
+            The order entity returned by Razorpay (includes 'id').
+
+        Raises:
+            RazorpayError: Razorpay rejected the request.
+            httpx.HTTPError: Network failure or timeout.
+        """
+        started = time.perf_counter()
+        try:
+            response = await self.client.post("/orders", json=data)
+        except Exception as e:
+            record_upstream("razorpay", "orders", started, e)
+            raise
+        record_upstream("razorpay", "orders", started, response.status_code)
+        if response.status_code >= 400:
+            try:
+                error = response.json().get("error", {})
+            except ValueError:
+                error = {}
+            raise RazorpayError(
+                response.status_code,
+                error.get("code", "SERVER_ERROR"),
+                error.get("description", response.text),
+            )
+        return response.json()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
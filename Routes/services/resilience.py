@@ -0,0 +1,259 @@
+"""
+Upstream Resilience.
+
+Building blocks that keep a slow or failing third-party API from tying up the
+process (used by graphy.py):
+
+- CircuitBreaker: after `failure_threshold` consecutive failures the circuit
+  opens and calls fail immediately with CircuitOpenError. After
+  `recovery_time` seconds it half-opens and lets one probe call through; the
+  probe's outcome closes or re-opens it.
+- AdaptiveLimiter: caps concurrent calls. The limit grows by one after a full
+  window of calls whose latency stays within `tolerance` times the observed
+  baseline, and shrinks by a quarter (at most once per second) when latency
+  rises above that or a call fails. Callers wait up to `wait_timeout` seconds
+  for a slot, then get LimiterTimeout.
+- RetryBudget: every call earns `ratio` retry tokens and every retry spends
+  one, so retries stay a bounded fraction of traffic and stop entirely while
+  an upstream is failing everything.
+- backoff_delay(): exponential backoff with full jitter, shared by the Graphy
+  retries and the enrollment queue.
+
+State is exported as metrics and through snapshot() for /healthcheck. All
+methods must be called from the event loop thread.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from Routes.services.metrics import upstream_circuit_state, upstream_concurrency_limit, upstream_rejected
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given attempt count (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** (attempts - 1))))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class LimiterTimeout(Exception):
+    """Raised when no concurrency slot frees up within the wait timeout."""
+
+
+class CircuitBreaker:
+    """
+    Args:
+        service: Upstream name, e.g. 'graphy'.
+        operation: Endpoint name, e.g. 'assign'.
+        failure_threshold: Consecutive failures that open the circuit.
+        recovery_time: Seconds the circuit stays open before a probe is allowed.
+    """
+
+    def __init__(self, service: str, operation: str, failure_threshold: int, recovery_time: float):
+        self.service = service
+        self.operation = operation
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        upstream_circuit_state.set(0, service, operation)
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.recovery_time:
+            return HALF_OPEN
+        return OPEN
+
+    def check(self) -> bool:
+        """
+        Raise CircuitOpenError unless a call may go through now.
+
+        Returns:
+            True if the call is the half-open probe. A probe that is not sent
+            after all must be handed back with release_probe().
+        """
+        state = self.state
+        if state == CLOSED:
+            return False
+        now = time.monotonic()
+        # One probe at a time; a probe that never reported back stops
+        # blocking others after another recovery_time
+        if state == HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.recovery_time):
+            self._probe_started = now
+            upstream_circuit_state.set(_STATE_VALUES[HALF_OPEN], self.service, self.operation)
+            return True
+        upstream_rejected.inc(self.service, self.operation, "circuit_open")
+        raise CircuitOpenError(f"{self.service} {self.operation} circuit is open")
+
+    def release_probe(self) -> None:
+        """The probe admitted by check() was not sent (or was cancelled); let the next call probe."""
+        self._probe_started = None
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            self._opened_at = self._probe_started = None
+            upstream_circuit_state.set(_STATE_VALUES[CLOSED], self.service, self.operation)
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            # Re-opened by a failed probe, or tripped by consecutive failures
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+            upstream_circuit_state.set(_STATE_VALUES[OPEN], self.service, self.operation)
+
+    def snapshot(self) -> Dict[str, object]:
+        state = self.state
+        info: Dict[str, object] = {"state": state, "consecutive_failures": self.failures}
+        if state == OPEN:
+            info["retry_in_seconds"] = round(self.recovery_time - (time.monotonic() - self._opened_at), 1)
+        return info
+
+
+class AdaptiveLimiter:
+    """
+    Args:
+        service: Upstream name, for metrics.
+        initial: Starting concurrency limit.
+        minimum: Lowest the limit can shrink to.
+        maximum: Highest the limit can grow to.
+        wait_timeout: Seconds to wait for a free slot before LimiterTimeout.
+        tolerance: Latency above baseline * tolerance counts as congestion.
+    """
+
+    DECREASE_FACTOR = 0.75
+    DECREASE_COOLDOWN = 1.0
+    # How quickly the latency baseline follows a sustained rise
+    BASELINE_DRIFT = 0.01
+
+    def __init__(
+        self,
+        service: str,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        wait_timeout: float,
+        tolerance: float = 2.0,
+    ):
+        self.service = service
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.wait_timeout = wait_timeout
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        upstream_concurrency_limit.set(self.limit, service)
+
+    async def acquire(self, operation: str = "") -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while self.in_flight >= self.limit:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                upstream_rejected.inc(self.service, operation, "limiter_timeout")
+                # Pass on any wake-up this waiter consumed
+                self._wake()
+                raise LimiterTimeout(f"{self.service} concurrency limit {self.limit} reached")
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                self._wake()
+                raise
+        self.in_flight += 1
+
+    def release(self, latency: float, ok: Optional[bool]) -> None:
+        """
+        Free a slot and adapt the limit to the call's latency and outcome.
+
+        Args:
+            latency: Seconds the call took.
+            ok: Whether the upstream answered healthily; None for a call that
+                was abandoned (cancelled), which leaves the limit unchanged.
+        """
+        self.in_flight -= 1
+        if ok is None:
+            self._wake()
+            return
+        if ok:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * self.BASELINE_DRIFT
+        if not ok or latency > self.baseline * self.tolerance:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.DECREASE_COOLDOWN:
+                self._last_decrease = now
+                self._set_limit(int(self.limit * self.DECREASE_FACTOR))
+            self._successes = 0
+        else:
+            self._successes += 1
+            if self._successes >= self.limit:
+                self._successes = 0
+                self._set_limit(self.limit + 1)
+        self._wake()
+
+    def _set_limit(self, limit: int) -> None:
+        self.limit = min(self.maximum, max(self.minimum, limit))
+        upstream_concurrency_limit.set(self.limit, self.service)
+
+    def _wake(self) -> None:
+        free = self.limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "concurrency_limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": sum(1 for waiter in self._waiters if not waiter.done()),
+            "baseline_latency_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+        }
+
+
+class RetryBudget:
+    """
+    Args:
+        ratio: Retry tokens earned per call.
+        max_tokens: Cap on saved-up tokens (also the initial balance).
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend a token for one retry. False if the budget is exhausted."""
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
@@ -0,0 +1,197 @@
+"""
+Production Server.
+
+Pre-fork launcher used by `python app.py`. The parent process loads the page,
+asset and compression caches once, binds the listening socket, then forks
+WEB_CONCURRENCY uvicorn workers that all accept on that socket. The caches are
+built before the fork (and frozen out of the garbage collector's reach), so
+workers share those pages copy-on-write instead of each holding a private copy.
+When the image carries a page bundle (bundle.py) the caches are memory-mapped
+from it rather than built, so this step takes milliseconds.
+With FAST_STARTUP=1 app.py skips this step so the workers start serving
+sooner, and each worker warms its own caches in the background.
+
+- Worker count defaults to the CPUs actually available to the container
+  (cgroup CPU quota and affinity mask), at least 1.
+- uvloop and httptools are used when installed, otherwise asyncio and h11.
+- SIGTERM/SIGINT are forwarded to the workers, which stop accepting, finish
+  in-flight requests (up to GRACEFUL_TIMEOUT seconds) and run the app's
+  shutdown; a worker that dies unexpectedly is replaced.
+- SIGHUP is forwarded to the workers (the app reloads its course catalog).
+
+Settings (environment):
+    HOST, PORT              bind address (default 0.0.0.0:5500)
+    WEB_CONCURRENCY         worker processes (default: available CPUs)
+    KEEPALIVE_TIMEOUT       idle keep-alive seconds (default 65, longer than
+                            typical proxy idle timeouts)
+    BACKLOG                 listen() backlog (default 2048)
+    GRACEFUL_TIMEOUT        seconds to drain on shutdown (default 30)
+    LIMIT_CONCURRENCY       per-worker cap on concurrent connections before
+                            answering 503 (default: unlimited)
+"""
+
+import gc
+import importlib.util
+import logging
+import math
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict, Optional
+
+import uvicorn
+
+from Routes.services.log_pipeline import stop_logging
+
+logger = logging.getLogger(__name__)
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "5500"))
+WEB_CONCURRENCY = os.getenv("WEB_CONCURRENCY")
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "65"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0")) or None
+
+# Minimum seconds between respawns of a crashing worker
+RESPAWN_DELAY = 1.0
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring the cgroup v2 quota and affinity mask."""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, count)
+
+
+def worker_count() -> int:
+    if WEB_CONCURRENCY:
+        return max(1, int(WEB_CONCURRENCY))
+    return available_cpus()
+
+
+def _config(app) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        limit_concurrency=LIMIT_CONCURRENCY,
+        backlog=BACKLOG,
+        # Leave uvicorn's loggers unconfigured so they propagate to the
+        # queue-based root handler (Routes/services/log_pipeline.py)
+        log_config=None,
+    )
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, worker_id: int) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if hasattr(signal, "SIGHUP"):
+        # Ignored until the app's lifespan installs its own handler
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    os.environ["WORKER_ID"] = str(worker_id)
+    config = _config(app)
+    logger.info("Worker %d (pid %d) serving with %s/%s", worker_id, os.getpid(), config.loop, config.http)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(app, preload: Optional[Callable[[], None]] = None, workers: Optional[int] = None) -> None:
+    """
+    Run the app with pre-forked workers until SIGTERM/SIGINT.
+
+    Args:
+        app: ASGI application.
+        preload: Called once in the parent before forking, to warm shared caches.
+        workers: Worker processes (default: worker_count()).
+    """
+    workers = workers or worker_count()
+    if not hasattr(os, "fork"):
+        # Windows: no fork, run a single worker
+        workers = 1
+    if preload is not None:
+        preload()
+    # Keep the preloaded objects out of the collector so it never touches
+    # (and un-shares) their pages in the workers
+    gc.freeze()
+
+    sock = _bind(HOST, PORT)
+    logger.info("Listening on %s:%d with %d worker(s), backlog %d", HOST, PORT, workers, BACKLOG)
+
+    if workers == 1:
+        _run_worker(app, sock, 0)
+        return
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(worker_id: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, sock, worker_id)
+            except BaseException:
+                logger.exception("Worker %d crashed", worker_id)
+                code = 1
+            finally:
+                stop_logging()
+                os._exit(code)
+        children[pid] = worker_id
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        logger.info("Received %s, draining %d worker(s)", signal.Signals(signum).name, len(children))
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def forward(signum, frame) -> None:
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    for worker_id in range(workers):
+        spawn(worker_id)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, forward)
+
+    last_respawn = 0.0
+    while children:
+        pid, status = os.wait()
+        worker_id = children.pop(pid, None)
+        if worker_id is None or stopping:
+            continue
+        logger.error("Worker %d (pid %d) exited with status %d; restarting", worker_id, pid, os.waitstatus_to_exitcode(status))
+        time.sleep(max(0.0, last_respawn + RESPAWN_DELAY - time.monotonic()))
+        last_respawn = time.monotonic()
+        spawn(worker_id)
+
+    sock.close()
+    logger.info("All workers stopped")
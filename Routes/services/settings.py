@@ -0,0 +1,55 @@
+"""
+Application Settings.
+
+The .env file is read exactly once, when this module is first imported; app.py
+imports it before anything else, so every module's os.getenv() tunables see
+the .env values. The credentials and startup options the app cannot run
+without are collected into one typed, immutable Settings object.
+
+Settings (environment):
+    RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET
+    TEST_PRICE_OVERRIDE     logged as a warning at startup
+    GRAPHY_MID, GRAPHY_API_KEY
+    METRICS_TOKEN           bearer token required by GET /metrics (optional)
+    FAST_STARTUP            start serving before the page and compression
+                            caches are warm; they are built in the background
+                            (and on demand) instead of before the first request
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class Settings:
+    razorpay_key_id: Optional[str]
+    razorpay_key_secret: Optional[str]
+    test_price_override: Optional[str]
+    graphy_mid: Optional[str]
+    graphy_api_key: Optional[str]
+    metrics_token: Optional[str]
+    fast_startup: bool
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "Settings":
+        return cls(
+            razorpay_key_id=environ.get("RAZORPAY_KEY_ID"),
+            razorpay_key_secret=environ.get("RAZORPAY_KEY_SECRET"),
+            test_price_override=environ.get("TEST_PRICE_OVERRIDE"),
+            graphy_mid=environ.get("GRAPHY_MID"),
+            graphy_api_key=environ.get("GRAPHY_API_KEY"),
+            metrics_token=environ.get("METRICS_TOKEN"),
+            fast_startup=_flag(environ.get("FAST_STARTUP")),
+        )
+
+
+settings = Settings.from_env()
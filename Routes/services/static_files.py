@@ -0,0 +1,108 @@
+"""
+Static File Serving.
+
+StaticFiles subclass used for the /Resources, /style and /figma_reference
+mounts. Text assets are served from their precompressed gzip/brotli variants
+(see compression.py) when the client accepts them; everything else is sent
+by StaticFileResponse (file_responses.py), from memory or read in a worker
+thread, with Range support. Every response gets a Cache-Control
+policy from http_cache.py, and conditional requests are answered with 304.
+
+ContentAddressedFiles serves the /assets/<hash><ext> URLs of asset_store.py
+straight from the original files under Resources/.
+"""
+
+import mimetypes
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import RedirectResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from Routes.services.asset_store import ASSET_DEDUP_REDIRECT, asset_store
+from Routes.services.file_responses import StaticFileResponse
+from Routes.services.compression import TEXT_SUFFIXES, negotiate, static_variants
+from Routes.services.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    STATIC_CACHE_CONTROL,
+    http_date,
+    is_not_modified,
+    static_cache_control,
+)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    # Cache-Control per request from static_cache_control(): immutable only
+    # for hashed files and ?v= URLs matching the file's current version
+    immutable = False
+
+    def __init__(self, *args, redirect_duplicates: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Send legacy paths of duplicated files to their canonical /assets URL
+        self.redirect_duplicates = redirect_duplicates and ASSET_DEDUP_REDIRECT
+
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = str(full_path)
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        if self.redirect_duplicates and asset_store.is_duplicate(full_path):
+            return RedirectResponse(
+                asset_store.canonical_url(full_path),
+                status_code=302,
+                headers={"Cache-Control": STATIC_CACHE_CONTROL},
+            )
+
+        if self.immutable:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = static_cache_control(full_path, stat_result.st_mtime_ns, scope.get("query_string", b""))
+
+        entry = None
+        if os.path.splitext(full_path)[1].lower() in TEXT_SUFFIXES:
+            entry = static_variants.get(full_path, stat_result.st_mtime_ns)
+        if entry is None:
+            response = StaticFileResponse(full_path, stat_result=stat_result, headers={"Cache-Control": cache_control})
+            if self.is_not_modified(response.headers, Headers(scope=scope)):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        digest, variants = entry
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding"), variants)
+        etag = f'"{digest[:32]}"' if encoding is None else f'"{digest[:32]}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": http_date(stat_result.st_mtime),
+            "Vary": "Accept-Encoding",
+            "Cache-Control": cache_control,
+        }
+        if is_not_modified(request_headers, etag, stat_result.st_mtime):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return StaticFileResponse(full_path, stat_result=stat_result, headers=headers)
+
+        headers["Content-Encoding"] = encoding
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        return Response(content=variants[encoding], headers=headers, media_type=media_type)
+
+
+class ContentAddressedFiles(PrecompressedStaticFiles):
+    # Every URL this mount serves pins its content
+    immutable = True
+
+    def lookup_path(self, path: str):
+        full_path = asset_store.lookup(path)
+        if full_path is None:
+            return "", None
+        try:
+            return full_path, os.stat(full_path)
+        except OSError:
+            return "", None
@@ -0,0 +1,168 @@
+"""
+Page Templates.
+
+Near-duplicate funnel pages share one layout under components/layouts/. A page
+built from a layout keeps only the parts that differ:
+
+    {% extends "components/layouts/cart.html" %}
+    {% block price %}₹9,991{% endblock %}
+    {% block plan %}value-plan{% endblock %}
+
+A layout marks each of those parts with an empty {% block name %}{% endblock %}.
+A page must fill every block of its layout and nothing else. Block content is
+inserted verbatim: there are no expressions, filters or nested blocks, so a
+compiled layout is a tuple of literal chunks and rendering is a single join.
+Layouts are compiled once and recompiled only when their file changes.
+
+The page registry (pages.py) renders each page once when it is loaded and
+caches the resulting bytes like any other page, so page routes and keys are
+unchanged. Files that do not start with {% extends %} are loaded as they are.
+Layout paths are relative to the project root, like page registry keys.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+EXTENDS_RE = re.compile(r'\A\s*\{%\s*extends\s+"([^"]+)"\s*%\}')
+BLOCK_RE = re.compile(r"\{%\s*block\s+(\w+)\s*%\}(.*?)\{%\s*endblock\s*%\}", re.DOTALL)
+TAG_RE = re.compile(r"\{%.*?%\}", re.DOTALL)
+# An extends tag has to open the file, so peeking at the start is enough
+EXTENDS_PEEK = 512
+
+
+class TemplateError(ValueError):
+    """A layout or page that cannot be rendered."""
+
+
+@dataclass(frozen=True)
+class Layout:
+    """A compiled layout: literal chunks alternating with block names."""
+
+    key: str
+    mtime_ns: int
+    chunks: Tuple[str, ...]
+
+    @property
+    def blocks(self) -> Tuple[str, ...]:
+        return self.chunks[1::2]
+
+    def render(self, blocks: Dict[str, str]) -> str:
+        parts = list(self.chunks)
+        parts[1::2] = [blocks[name] for name in self.blocks]
+        return "".join(parts)
+
+
+@dataclass(frozen=True)
+class Source:
+    """A page's final HTML and the newest mtime of the files it was built from."""
+
+    body: bytes
+    mtime_ns: int
+
+
+_layouts: Dict[str, Layout] = {}
+
+
+def _parse_blocks(text: str, key: str) -> Dict[str, str]:
+    """Return {name: content} for the blocks in text. Anything else between them must be whitespace."""
+    blocks: Dict[str, str] = {}
+    for match in BLOCK_RE.finditer(text):
+        name, content = match.group(1), match.group(2)
+        if TAG_RE.search(content):
+            raise TemplateError(f"{key}: block '{name}' contains a template tag")
+        if name in blocks:
+            raise TemplateError(f"{key}: block '{name}' is defined twice")
+        blocks[name] = content
+    stray = BLOCK_RE.sub("", text).strip()
+    if stray:
+        raise TemplateError(f"{key}: text outside a block: {stray[:60]!r}")
+    return blocks
+
+
+def compile_layout(key: str, text: str, mtime_ns: int = 0) -> Layout:
+    """Split a layout into literal chunks and block names."""
+    if EXTENDS_RE.match(text):
+        raise TemplateError(f"{key}: a layout cannot extend another layout")
+    chunks = []
+    seen = set()
+    position = 0
+    for match in BLOCK_RE.finditer(text):
+        name, default = match.group(1), match.group(2)
+        if default:
+            raise TemplateError(f"{key}: layout block '{name}' must be empty")
+        if name in seen:
+            raise TemplateError(f"{key}: block '{name}' is defined twice")
+        seen.add(name)
+        chunks.append(text[position:match.start()])
+        chunks.append(name)
+        position = match.end()
+    chunks.append(text[position:])
+    for literal in chunks[::2]:
+        tag = TAG_RE.search(literal)
+        if tag:
+            raise TemplateError(f"{key}: unexpected tag {tag.group(0)!r}")
+    return Layout(key=key, mtime_ns=mtime_ns, chunks=tuple(chunks))
+
+
+def get_layout(key: str, root: Path = PROJECT_ROOT) -> Layout:
+    """Return the compiled layout for key, recompiling it if the file changed."""
+    path = root / key
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise TemplateError(f"layout not found: {key}") from None
+    layout = _layouts.get(key)
+    if layout is None or layout.mtime_ns != mtime_ns:
+        layout = compile_layout(key, path.read_text(encoding="utf-8"), mtime_ns)
+        _layouts[key] = layout
+    return layout
+
+
+def extends(text: str) -> Optional[str]:
+    """The layout key a page extends, or None for a standalone page."""
+    match = EXTENDS_RE.match(text)
+    return match.group(1) if match else None
+
+
+def render(key: str, text: str, root: Path = PROJECT_ROOT) -> str:
+    """Render a page that extends a layout."""
+    match = EXTENDS_RE.match(text)
+    if match is None:
+        raise TemplateError(f"{key}: does not extend a layout")
+    layout = get_layout(match.group(1), root)
+    blocks = _parse_blocks(text[match.end():], key)
+    missing = [name for name in layout.blocks if name not in blocks]
+    unknown = [name for name in blocks if name not in layout.blocks]
+    if missing or unknown:
+        raise TemplateError(f"{key}: missing blocks {missing}, unknown blocks {unknown} for {layout.key}")
+    return layout.render(blocks)
+
+
+def load_page(key: str, path: Path, root: Path = PROJECT_ROOT) -> Source:
+    """Read a page file, rendering it through its layout if it extends one."""
+    mtime_ns = path.stat().st_mtime_ns
+    body = path.read_bytes()
+    layout_key = extends(body[:EXTENDS_PEEK].decode("utf-8", "ignore"))
+    if layout_key is None:
+        return Source(body=body, mtime_ns=mtime_ns)
+    html = render(key, body.decode("utf-8"), root)
+    layout = get_layout(layout_key, root)
+    return Source(body=html.encode("utf-8"), mtime_ns=max(mtime_ns, layout.mtime_ns))
+
+
+def page_mtime_ns(path: Path, root: Path = PROJECT_ROOT) -> int:
+    """The mtime load_page() would report for path, without rendering it."""
+    mtime_ns = path.stat().st_mtime_ns
+    with path.open("rb") as f:
+        head = f.read(EXTENDS_PEEK)
+    layout_key = extends(head.decode("utf-8", "ignore"))
+    if layout_key is None:
+        return mtime_ns
+    try:
+        return max(mtime_ns, (root / layout_key).stat().st_mtime_ns)
+    except FileNotFoundError:
+        return mtime_ns
@@ -1,48 +1,112 @@
+import argparse
+import asyncio
+import logging
 import os
+import signal
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
-import uvicorn
-from dotenv import load_dotenv
 
-load_dotenv()
+# Reads .env; must come before any module that reads the environment at import
+from Routes.services.settings import settings
+from Routes.services.log_pipeline import configure_logging
+
+configure_logging()
 
 from Routes import healthcheck
-from Routes import homepage
-from Routes import thankYouPage
-from Routes import cartpage
-from Routes import advancedHomepage
-from Routes import metaHomepage
-from Routes import policyPages
 from Routes import payments
-from Routes import fofaSubroutes
-from Routes import courses
-from Routes import landingPage
-from Routes import contactUs
-from Routes import figmaRoutes
-app = FastAPI()
+from Routes import metrics
+from Routes.pageManifest import PAGES
+from Routes.services.pages import registry as page_registry
+from Routes.services.page_routes import PageTable
+from Routes.services.compression import static_variants
+from Routes.services.asset_store import asset_store
+from Routes.services.bundle import load_bundle
+from Routes.services.metrics import MetricsMiddleware
+from Routes.services.static_files import ContentAddressedFiles, PrecompressedStaticFiles
+from Routes.payments import orders_client as razorpay_orders_client
+from Routes.payments import enrollment_queue, processed_payments
+from Routes.services import graphy
+
+logger = logging.getLogger(__name__)
+
+_caches_loaded = False
+
+
+def preload_caches():
+    # Load every HTML page (and its compressed variants) into memory once,
+    # before the first request is served. The production launcher calls this
+    # before forking so workers share the caches.
+    global _caches_loaded
+    if _caches_loaded:
+        return
+    # Whatever the page bundle holds is mapped instead of rebuilt
+    load_bundle()
+    if not asset_store.built:
+        asset_store.build()
+    page_registry.preload(skip_loaded=True)
+    page_table.compile()
+    static_variants.preload(skip_loaded=True)
+    _caches_loaded = True
+
+
+async def _warm_caches():
+    try:
+        await asyncio.to_thread(preload_caches)
+    except Exception:
+        logger.exception("Background cache warm-up failed; pages will be built on first request")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = None
+    if settings.fast_startup and not _caches_loaded:
+        # Start serving right away. /assets URLs need the asset index up
+        # front; pages and compressed variants come from the page bundle or
+        # are built in the background, or on demand if a request gets there
+        # first.
+        load_bundle()
+        if not asset_store.built:
+            asset_store.build()
+        warmup = asyncio.create_task(_warm_caches())
+    else:
+        preload_caches()
+    # Signal handlers can only be installed from the main thread (not when the
+    # app runs under TestClient or the benchmark harness)
+    if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, payments.reload_catalog)
+    graphy.get_client()
+    await processed_payments.load()
+    await enrollment_queue.start()
+    yield
+    if warmup is not None:
+        await warmup
+    await enrollment_queue.stop()
+    await processed_payments.close()
+    await razorpay_orders_client.aclose()
+    await graphy.close_client()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/.well-known/appspecific/com.chrome.devtools.json")
 async def chrome_devtools_config():
     return {}
 
 app.include_router(healthcheck.router)
-app.include_router(homepage.router)
-app.include_router(thankYouPage.router)
-app.include_router(cartpage.router)
-app.include_router(advancedHomepage.router)
-app.include_router(metaHomepage.router)
-app.include_router(policyPages.router)
 app.include_router(payments.router)
-app.include_router(fofaSubroutes.router)
-app.include_router(courses.router)
-app.include_router(landingPage.router)
-app.include_router(contactUs.router)
-app.include_router(figmaRoutes.router)
+app.include_router(metrics.router)
 
-app.mount("/Resources", StaticFiles(directory="Resources"), name="Resources")
-app.mount("/style", StaticFiles(directory="style"), name="style")
-app.mount("/figma_reference", StaticFiles(directory="figma_reference"), name="figma_reference")
+# Every HTML page, matched by exact path before the other routes are scanned
+page_table = PageTable(PAGES)
+app.router.routes.insert(0, page_table)
+
+app.mount("/assets", ContentAddressedFiles(directory="Resources"), name="assets")
+app.mount("/Resources", PrecompressedStaticFiles(directory="Resources", redirect_duplicates=True), name="Resources")
+app.mount("/style", PrecompressedStaticFiles(directory="style"), name="style")
+app.mount("/figma_reference", PrecompressedStaticFiles(directory="figma_reference"), name="figma_reference")
 
 
 
@@ -51,5 +115,15 @@ async def not_found_exception_handler(request: Request, exc):
     return JSONResponse(status_code=404, content={"message": "Page not found"})
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5500))
-    uvicorn.run("app:app", host="0.0.0.0", port=port, reload=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the RoasGuy web server")
+    parser.add_argument("--dev", action="store_true", help="single process with auto-reload on code changes")
+    args = parser.parse_args()
+
+    if args.dev:
+        import uvicorn
+
+        port = int(os.environ.get("PORT", 5500))
+        uvicorn.run("app:app", host="0.0.0.0", port=port, reload=True)
+    else:
+        from Routes.services.server import serve
+        serve(app, preload=None if settings.fast_startup else preload_caches)
\ No newline at end of file
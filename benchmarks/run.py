@@ -0,0 +1,416 @@
+"""
+Load-Testing Benchmark.
+
+Starts the app in-process under uvicorn, with local stub servers standing in
+for Razorpay and Graphy (see stubs.py), and drives a weighted mix of traffic
+at each concurrency level:
+
+    - landing         -> GET /
+    - cart            -> GET one of the cart pages
+    - create_order    -> POST /api/create-order
+    - verify_payment  -> POST /api/verify-payment (validly signed, so it enqueues
+                         an enrollment that the queue workers run against the
+                         Graphy stub in the background)
+
+Reports p50/p95/p99 latency per scenario and overall, throughput, status codes
+and the app event loop's scheduling lag, and writes everything to JSON
+(benchmarks/results/ by default) so runs can be compared across commits.
+
+    python -m benchmarks.run                                      # defaults
+    python -m benchmarks.run --concurrency 10,50,200 --duration 30
+    python -m benchmarks.run --razorpay-latency 0.3 --graphy-error-rate 0.05
+
+The app, the stubs and the load generator share one process (each server on
+its own thread and event loop), so absolute numbers are lower than a real
+deployment; compare runs made on the same machine with the same options.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from benchmarks.stubs import StubBehavior, graphy_app, razorpay_app
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+BENCH_KEY_ID = "rzp_test_benchmark"
+BENCH_KEY_SECRET = "benchmark-secret"
+ORIGIN = "http://localhost"
+
+CART_ROUTES = (
+    "/fundamentals-of-facebook-ads/cartpage",
+    "/fundamentals-of-facebook-ads/students/cart",
+    "/psychology-driven-advanced-meta-ad-course/basic-cart",
+    "/master-creative-targeting/meta-base-cart",
+    "/master-creative-targeting/meta-mentorship-cart",
+)
+
+COURSE_IDS = (
+    "fundamentals-of-facebook-ads",
+    "fundamentals-of-facebook-ads-student",
+    "value-plan",
+    "master-creative-targeting-base",
+    "master-creative-targeting-mentorship",
+)
+
+GRAPHY_PRODUCT_ENVS = (
+    "GRAPHY_PRODUCT_FUNDAMENTALS",
+    "GRAPHY_PRODUCT_BUSINESS_GROWTH",
+    "GRAPHY_PRODUCT_VALUE_PLAN",
+    "GRAPHY_PRODUCT_MCT_BASE",
+    "GRAPHY_PRODUCT_MCT_MENTORSHIP",
+    "GRAPHY_PRODUCT_BUSINESS_GROWTH_PARTNER",
+    "GRAPHY_PRODUCT_BUSINESS_GROWTH_MASTERY",
+)
+
+DEFAULT_MIX = "landing=40,cart=30,create_order=20,verify_payment=10"
+LAG_INTERVAL = 0.01
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """Nearest-rank p50/p95/p99, max and mean of samples (seconds), in milliseconds."""
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, max(0, int(p * len(ordered) + 0.5) - 1))] * 1000, 3)
+
+    return {
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+class ServerThread(threading.Thread):
+    """A uvicorn server on its own event loop, optionally sampling that loop's lag."""
+
+    def __init__(self, app, port: int, monitor_lag: bool = False):
+        super().__init__(daemon=True)
+        self.port = port
+        self.monitor_lag = monitor_lag
+        self.lag_samples: List[float] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", access_log=False,
+        ))
+
+    def run(self) -> None:
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        monitor = asyncio.create_task(self._monitor()) if self.monitor_lag else None
+        try:
+            await self.server.serve()
+        finally:
+            if monitor:
+                monitor.cancel()
+
+    async def _monitor(self) -> None:
+        # A sleep that overshoots its deadline means something held the loop
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lag_samples.append(max(0.0, time.perf_counter() - started - LAG_INTERVAL))
+
+    def start_and_wait(self, timeout: float = 60) -> None:
+        self.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.05)
+
+    def call(self, coro, timeout: float = 30):
+        """Run a coroutine on this server's event loop and return its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.join(timeout=30)
+
+
+def _configure_environment(razorpay_port: int, graphy_port: int, db_path: str) -> None:
+    # Must run before the app is imported: its modules read config at import time
+    os.environ["RAZORPAY_API_BASE"] = f"http://127.0.0.1:{razorpay_port}/v1"
+    os.environ["RAZORPAY_KEY_ID"] = BENCH_KEY_ID
+    os.environ["RAZORPAY_KEY_SECRET"] = BENCH_KEY_SECRET
+    os.environ["GRAPHY_API_BASE"] = f"http://127.0.0.1:{graphy_port}"
+    os.environ["GRAPHY_MID"] = "benchmark"
+    os.environ["GRAPHY_API_KEY"] = "benchmark"
+    for name in GRAPHY_PRODUCT_ENVS:
+        os.environ[name] = "benchmark-product"
+    os.environ["ENROLLMENT_QUEUE_DB"] = db_path
+    os.environ.pop("TEST_PRICE_OVERRIDE", None)
+
+
+def _customer(rng: random.Random) -> dict:
+    n = rng.randrange(10**6)
+    return {
+        "course_id": rng.choice(COURSE_IDS),
+        "name": f"Bench User {n}",
+        "email": f"bench{n}@example.com",
+        "phone": f"+9198{n:08d}",
+    }
+
+
+async def _landing(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+    return await client.get("/")
+
+
+async def _cart(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+    return await client.get(rng.choice(CART_ROUTES))
+
+
+async def _create_order(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+    return await client.post("/api/create-order", json=_customer(rng), headers={"Origin": ORIGIN})
+
+
+async def _verify_payment(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+    order_id = f"order_{uuid.uuid4().hex[:14]}"
+    payment_id = f"pay_{uuid.uuid4().hex[:14]}"
+    signature = hmac.new(BENCH_KEY_SECRET.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+    body = {
+        "razorpay_order_id": order_id,
+        "razorpay_payment_id": payment_id,
+        "razorpay_signature": signature,
+        **_customer(rng),
+    }
+    return await client.post("/api/verify-payment", json=body, headers={"Origin": ORIGIN})
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "landing": _landing,
+    "cart": _cart,
+    "create_order": _create_order,
+    "verify_payment": _verify_payment,
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run_level(
+    base_url: str,
+    app_server: ServerThread,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    mix: Dict[str, float],
+    seed: int,
+) -> dict:
+    """Drive `concurrency` closed-loop users for warmup + duration seconds and summarise."""
+    names, weights = list(mix), list(mix.values())
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Counter = Counter()
+    statuses: Counter = Counter()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Accept-Encoding": "br, gzip"}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, headers=headers, timeout=60) as client:
+        measure_from = time.perf_counter() + warmup
+        deadline = measure_from + duration
+        lag_reset = False
+
+        async def user(index: int) -> None:
+            nonlocal lag_reset
+            rng = random.Random(seed * 100_003 + index)
+            while True:
+                started = time.perf_counter()
+                if started >= deadline:
+                    return
+                if started >= measure_from and not lag_reset:
+                    app_server.lag_samples.clear()
+                    lag_reset = True
+                name = rng.choices(names, weights)[0]
+                try:
+                    response = await SCENARIOS[name](client, rng)
+                    await response.aread()
+                    status = str(response.status_code)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                    failed = True
+                if started < measure_from:
+                    continue
+                samples[name].append(time.perf_counter() - started)
+                statuses[status] += 1
+                if failed:
+                    errors[name] += 1
+
+        wall_started = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        measured = time.perf_counter() - max(measure_from, wall_started)
+
+    lag = list(app_server.lag_samples)
+    total = sum(len(s) for s in samples.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(measured, 3),
+        "requests": total,
+        "errors": sum(errors.values()),
+        "throughput_rps": round(total / measured, 2) if measured > 0 else 0.0,
+        "status_codes": dict(sorted(statuses.items())),
+        "latency_ms": percentiles([v for s in samples.values() for v in s]),
+        "scenarios": {
+            name: {
+                "requests": len(samples[name]),
+                "errors": errors[name],
+                "latency_ms": percentiles(samples[name]),
+            }
+            for name in names
+        },
+        "event_loop_lag_ms": {**percentiles(lag), "samples": len(lag)},
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_summary(result: dict) -> None:
+    print(f"\n{'concurrency':>11} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7} {'lag p99':>8}")
+    for level in result["levels"]:
+        latency, lag = level["latency_ms"], level["event_loop_lag_ms"]
+        print(
+            f"{level['concurrency']:>11} {level['throughput_rps']:>9.1f} {latency['p50'] or 0:>9.1f} "
+            f"{latency['p95'] or 0:>9.1f} {latency['p99'] or 0:>9.1f} {level['errors']:>7} {lag['p99'] or 0:>8.1f}"
+        )
+
+
+def run(args: argparse.Namespace) -> dict:
+    os.chdir(PROJECT_ROOT)
+    razorpay_port, graphy_port, app_port = _free_port(), _free_port(), _free_port()
+    workdir = tempfile.mkdtemp(prefix="roasguy-bench-")
+    _configure_environment(razorpay_port, graphy_port, os.path.join(workdir, "enrollment_queue.sqlite3"))
+
+    razorpay_behavior = StubBehavior(args.razorpay_latency, args.razorpay_jitter, args.razorpay_error_rate)
+    graphy_behavior = StubBehavior(args.graphy_latency, args.graphy_jitter, args.graphy_error_rate)
+    stubs = [
+        ServerThread(razorpay_app(razorpay_behavior), razorpay_port),
+        ServerThread(graphy_app(graphy_behavior), graphy_port),
+    ]
+    for stub in stubs:
+        stub.start_and_wait()
+
+    import app as app_module
+    from Routes.payments import enrollment_queue
+
+    logging.getLogger().setLevel(args.app_log_level)
+    app_server = ServerThread(app_module.app, app_port, monitor_lag=True)
+    app_server.start_and_wait()
+
+    result = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": args.mix,
+            "seed": args.seed,
+            "razorpay_stub": vars(razorpay_behavior),
+            "graphy_stub": vars(graphy_behavior),
+        },
+        "levels": [],
+    }
+    try:
+        for concurrency in args.concurrency:
+            logger.info("Running %d concurrent users for %ss (+%ss warm-up)", concurrency, args.duration, args.warmup)
+            level = asyncio.run(run_level(
+                f"http://127.0.0.1:{app_port}", app_server, concurrency,
+                args.duration, args.warmup, args.mix, args.seed,
+            ))
+            level["enrollment_queue"] = app_server.call(enrollment_queue.counts())
+            result["levels"].append(level)
+    finally:
+        app_server.stop()
+        for stub in stubs:
+            stub.stop()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the app against stubbed Razorpay and Graphy")
+    parser.add_argument("--concurrency", default="10,50,100", help="comma-separated concurrent users per level (default: 10,50,100)")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds per level (default: 15)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before each level (default: 3)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the traffic mix (default: 1)")
+    parser.add_argument("--razorpay-latency", type=float, default=0.25, help="stub Razorpay latency in seconds (default: 0.25)")
+    parser.add_argument("--razorpay-jitter", type=float, default=0.05, help="uniform +/- jitter in seconds (default: 0.05)")
+    parser.add_argument("--razorpay-error-rate", type=float, default=0.0, help="fraction of Razorpay calls that fail (default: 0)")
+    parser.add_argument("--graphy-latency", type=float, default=0.4, help="stub Graphy latency in seconds (default: 0.4)")
+    parser.add_argument("--graphy-jitter", type=float, default=0.1, help="uniform +/- jitter in seconds (default: 0.1)")
+    parser.add_argument("--graphy-error-rate", type=float, default=0.0, help="fraction of Graphy calls that fail (default: 0)")
+    parser.add_argument("--app-log-level", default="WARNING", help="app log level during the run (default: WARNING)")
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c]
+
+    logging.basicConfig(level=logging.INFO)
+    # run() quiets the root logger to --app-log-level; keep our own progress lines
+    logger.setLevel(logging.INFO)
+    result = run(args)
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{result['git_commit'] or 'nogit'}.json"
+    output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    _print_summary(result)
+    print(f"\nWrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Startup Benchmark.
+
+Measures how long the app takes to come up, the cost that shows up as
+downtime on every container restart:
+
+    - import profile     `python -X importtime -c "import app"`: total import
+                         time and the modules that contribute most to it
+    - time to first 200  `python app.py` is started as a subprocess and GET /
+                         is polled until it succeeds, once with the default
+                         startup and once with FAST_STARTUP=1
+
+Each measurement is repeated and the median reported; results are written to
+JSON (benchmarks/results/ by default) like the load-test benchmark.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --workers 2 --top 25
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.run import PROJECT_ROOT, RESULTS_DIR, _free_port, _git_commit
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+POLL_INTERVAL = 0.005
+
+
+def import_profile(top: int) -> dict:
+    """Import the app in a fresh interpreter under -X importtime."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=PROJECT_ROOT, env={**os.environ, "LOG_LEVEL": "WARNING"},
+        capture_output=True, text=True, check=True,
+    )
+    modules = []
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+        modules.append({"module": name, "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000})
+        if indent == 1 and name == "app":
+            total_us = cumulative_us
+    modules.sort(key=lambda m: m["self_ms"], reverse=True)
+    return {"import_app_ms": total_us / 1000, "modules": len(modules), "top_self_ms": modules[:top]}
+
+
+def time_to_first_response(fast_startup: bool, workers: int, timeout: float) -> float:
+    """Start `python app.py` and return the seconds until GET / answers 200."""
+    port = _free_port()
+    workdir = tempfile.mkdtemp(prefix="roasguy-startup-")
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "WEB_CONCURRENCY": str(workers),
+        "FAST_STARTUP": "1" if fast_startup else "",
+        "LOG_LEVEL": "WARNING",
+        "ENROLLMENT_QUEUE_DB": os.path.join(workdir, "enrollment_queue.sqlite3"),
+        "PROCESSED_PAYMENTS_DB": os.path.join(workdir, "processed_payments.sqlite3"),
+    }
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "app.py"], cwd=PROJECT_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while True:
+                elapsed = time.perf_counter() - started
+                if elapsed > timeout:
+                    raise TimeoutError(f"no response within {timeout}s")
+                if process.poll() is not None:
+                    raise RuntimeError(f"app.py exited with status {process.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(POLL_INTERVAL)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def _summary(samples: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "samples": len(samples),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    result = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "options": {"repeat": args.repeat, "workers": args.workers},
+        "imports": import_profile(args.top),
+        "time_to_first_response": {},
+    }
+    for mode, fast in (("default", False), ("fast_startup", True)):
+        samples = [time_to_first_response(fast, args.workers, args.timeout) for _ in range(args.repeat)]
+        result["time_to_first_response"][mode] = _summary(samples)
+    return result
+
+
+def _print_summary(result: dict) -> None:
+    imports = result["imports"]
+    print(f"\nimport app: {imports['import_app_ms']:.1f} ms across {imports['modules']} modules")
+    print(f"{'self ms':>9} {'cum ms':>9}  module")
+    for module in imports["top_self_ms"]:
+        print(f"{module['self_ms']:>9.1f} {module['cumulative_ms']:>9.1f}  {module['module']}")
+    print(f"\n{'startup':>12} {'median':>9} {'min':>9} {'max':>9}  (ms to first 200 on GET /)")
+    for mode, summary in result["time_to_first_response"].items():
+        print(f"{mode:>12} {summary['median_ms']:>9.1f} {summary['min_ms']:>9.1f} {summary['max_ms']:>9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile app imports and time to first response")
+    parser.add_argument("--repeat", type=int, default=5, help="server starts per mode (default: 5)")
+    parser.add_argument("--workers", type=int, default=1, help="WEB_CONCURRENCY for the server (default: 1)")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to report (default: 15)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for each start (default: 60)")
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/startup-<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    result = run(args)
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"startup-{time.strftime('%Y%m%d-%H%M%S')}-{result['git_commit'] or 'nogit'}.json"
+    output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    _print_summary(result)
+    print(f"\nWrote {output}")
+
+
+if __name__ == "__main__":
+    main()
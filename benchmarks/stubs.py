@@ -0,0 +1,84 @@
+"""
+Stub Upstream Servers.
+
+Minimal local stand-ins for the third-party APIs the app calls, used by the
+benchmark suite so load tests never reach Razorpay or Graphy.
+
+Endpoints stubbed:
+    - POST /v1/orders      -> Razorpay order creation
+    - POST /learners       -> Graphy learner creation
+    - POST /assign         -> Graphy course enrollment
+
+Every endpoint sleeps for a configurable latency (plus uniform jitter) and
+fails with a 5xx at a configurable rate.
+"""
+
+import asyncio
+import itertools
+import random
+from dataclasses import dataclass
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+@dataclass(frozen=True)
+class StubBehavior:
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+
+    async def delay(self) -> None:
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+
+def razorpay_app(behavior: StubBehavior) -> Starlette:
+    """Stub of the Razorpay Orders API (mounted at /v1, like the real base URL)."""
+    counter = itertools.count(1)
+
+    async def create_order(request: Request) -> JSONResponse:
+        data = await request.json()
+        await behavior.delay()
+        if behavior.should_fail():
+            return JSONResponse(
+                {"error": {"code": "SERVER_ERROR", "description": "stubbed upstream failure"}},
+                status_code=502,
+            )
+        return JSONResponse({
+            "id": f"order_bench{next(counter):010d}",
+            "entity": "order",
+            "amount": data.get("amount"),
+            "currency": data.get("currency"),
+            "receipt": data.get("receipt"),
+            "status": "created",
+        })
+
+    return Starlette(routes=[Route("/v1/orders", create_order, methods=["POST"])])
+
+
+def graphy_app(behavior: StubBehavior) -> Starlette:
+    """Stub of Graphy's public API learner and enrollment endpoints."""
+
+    async def learners(request: Request) -> JSONResponse:
+        await request.body()
+        await behavior.delay()
+        if behavior.should_fail():
+            return JSONResponse({"error": {"message": "stubbed upstream failure"}}, status_code=503)
+        return JSONResponse({"status": "success"})
+
+    async def assign(request: Request) -> JSONResponse:
+        await request.body()
+        await behavior.delay()
+        if behavior.should_fail():
+            return JSONResponse({"error": {"message": "stubbed upstream failure"}}, status_code=503)
+        return JSONResponse({"status": "success"})
+
+    return Starlette(routes=[
+        Route("/learners", learners, methods=["POST"]),
+        Route("/assign", assign, methods=["POST"]),
+    ])
@@ -0,0 +1,143 @@
+import os
+
+import pytest
+
+from Routes.services import bundle, compression, http_cache
+from Routes.services.asset_store import AssetStore
+from Routes.services.compression import STARTUP_LEVELS, StaticVariantStore
+from Routes.services.http_cache import version_asset_urls
+from Routes.services.inline_assets import extract_transform
+from Routes.services.pages import PageRegistry
+
+PAGE = (
+    '<html><head><link rel="stylesheet" href="/style/site.css"></head>'
+    '<body><img src="/figma_reference/logo.png">' + "<p>Enroll now</p>" * 100 + "</body></html>"
+)
+CSS = "body { color: #333; }\n" * 50
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    root = tmp_path / "site"
+    for directory in ("components", "style", "figma_reference", "Resources"):
+        (root / directory).mkdir(parents=True)
+    (root / "components" / "index.html").write_text(PAGE, encoding="utf-8")
+    (root / "components" / "plain.html").write_text("<html>" + "<p>plain</p>" * 100 + "</html>", encoding="utf-8")
+    (root / "style" / "site.css").write_text(CSS, encoding="utf-8")
+    (root / "figma_reference" / "logo.png").write_bytes(b"\x89PNG" + bytes(range(256)))
+    (root / "Resources" / "photo.jpg").write_bytes(b"\xff\xd8" + bytes(range(256)))
+    (root / "manifest.json").write_text('{"/Resources/photo.jpg": {}}', encoding="utf-8")
+
+    for mount in http_cache.STATIC_MOUNTS:
+        monkeypatch.setitem(http_cache.STATIC_MOUNTS, mount, root / mount)
+    monkeypatch.setattr(compression, "PRECOMPRESSED_DIR", tmp_path / "precompressed")
+    monkeypatch.setattr(bundle, "PROJECT_ROOT", root)
+    monkeypatch.setattr(bundle, "BUILD_LEVELS", STARTUP_LEVELS)
+    monkeypatch.setattr(bundle, "MANIFEST_PATH", root / "manifest.json")
+    reset(monkeypatch, root)
+
+    path = str(tmp_path / "pages.bundle")
+    bundle.build_bundle(path)
+    built = bundle.registry.pages()
+    reset(monkeypatch, root)
+    return root, path, built
+
+
+def reset(monkeypatch, root, transforms=(version_asset_urls,)) -> None:
+    """Fresh, empty caches, as in a newly started worker."""
+    monkeypatch.setattr(bundle, "_bundle", None)
+    monkeypatch.setattr(bundle, "registry", PageRegistry(root, directories=("components",), transforms=list(transforms)))
+    monkeypatch.setattr(bundle, "asset_store", AssetStore(root / "Resources"))
+    monkeypatch.setattr(bundle, "static_variants", StaticVariantStore(root, directories=("style",)))
+
+
+def bump_mtime(path) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_round_trip(site):
+    root, path, built = site
+    assert bundle.load_bundle(path) is not None
+
+    loaded = bundle.registry.pages()
+    assert sorted(loaded) == sorted(built) == ["components/index.html", "components/plain.html"]
+    for key, page in built.items():
+        restored = loaded[key]
+        assert isinstance(restored.body, memoryview)
+        assert bytes(restored.body) == page.body
+        assert (restored.etag, restored.mtime_ns, restored.headers, restored.links) == (page.etag, page.mtime_ns, page.headers, page.links)
+        assert {encoding: (bytes(data), headers) for encoding, (data, headers) in restored.variants.items()} == page.variants
+    assert b"/style/site.css?v=" in bytes(loaded["components/index.html"].body)
+
+    assert bundle.asset_store.built
+    assert bundle.asset_store.canonical_url(os.path.realpath(root / "Resources" / "photo.jpg")).startswith("/assets/")
+    css_path = os.path.realpath(root / "style" / "site.css")
+    assert bundle.static_variants.get(css_path, os.stat(css_path).st_mtime_ns) is not None
+
+
+def test_changed_page_is_not_loaded(site):
+    root, path, _ = site
+    bump_mtime(root / "components" / "plain.html")
+    bundle.load_bundle(path)
+    assert sorted(bundle.registry.pages()) == ["components/index.html"]
+
+
+def test_page_with_changed_versioned_asset_is_not_loaded(site):
+    root, path, _ = site
+    logo = root / "figma_reference" / "logo.png"
+    logo.write_bytes(logo.read_bytes() + b"changed")
+    bundle.load_bundle(path)
+    assert sorted(bundle.registry.pages()) == ["components/plain.html"]
+
+
+def test_touched_but_unchanged_versioned_asset_is_accepted(site):
+    root, path, _ = site
+    bump_mtime(root / "figma_reference" / "logo.png")
+    bundle.load_bundle(path)
+    assert sorted(bundle.registry.pages()) == ["components/index.html", "components/plain.html"]
+
+
+def test_changed_asset_store_file_discards_every_page(site):
+    root, path, _ = site
+    (root / "Resources" / "photo.jpg").write_bytes(b"new photo")
+    bundle.load_bundle(path)
+    assert bundle.registry.pages() == {}
+    assert not bundle.asset_store.built
+
+
+def test_changed_static_text_asset_is_rebuilt(site):
+    root, path, _ = site
+    css = root / "style" / "site.css"
+    css.write_text(CSS + "p { margin: 0; }\n", encoding="utf-8")
+    bundle.load_bundle(path)
+    assert bundle.static_variants.entries() == {}
+    assert bundle.registry.pages() == {}
+
+
+def test_changed_image_manifest_discards_every_page(site):
+    root, path, _ = site
+    (root / "manifest.json").write_text('{"/Resources/photo.jpg": {"sources": {}}}', encoding="utf-8")
+    bundle.load_bundle(path)
+    assert bundle.registry.pages() == {}
+
+
+def test_touched_but_unchanged_image_manifest_is_accepted(site):
+    root, path, _ = site
+    bump_mtime(root / "manifest.json")
+    bundle.load_bundle(path)
+    assert len(bundle.registry.pages()) == 2
+
+
+def test_changed_transforms_discard_every_page(site, monkeypatch):
+    root, path, _ = site
+    reset(monkeypatch, root, transforms=(extract_transform, version_asset_urls))
+    bundle.load_bundle(path)
+    assert bundle.registry.pages() == {}
+
+
+def test_file_that_is_not_a_bundle_is_ignored(tmp_path):
+    path = tmp_path / "pages.bundle"
+    path.write_bytes(b"not a bundle at all")
+    with pytest.raises(ValueError):
+        bundle.Bundle(str(path))
@@ -0,0 +1,32 @@
+import pytest
+
+from Routes.services.compression import negotiate
+
+BOTH = ("br", "gzip")
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("GZIP", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0.8, gzip;q=0.8", "br"),
+    ("br;q=0, gzip;q=0", None),
+    ("br;q=0, *", "gzip"),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("gzip;q=0.5, *;q=0.9", "br"),
+    ("br;q=abc, gzip", "gzip"),
+    (" br ; q=1.0 ,gzip", "br"),
+])
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, BOTH) == expected
+
+
+def test_negotiate_only_picks_available_encodings():
+    assert negotiate("br, gzip", ("gzip",)) == "gzip"
+    assert negotiate("br", ("gzip",)) is None
+    assert negotiate("br, gzip", ()) is None
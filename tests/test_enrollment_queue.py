@@ -0,0 +1,129 @@
+import asyncio
+import types
+
+import pytest
+
+from Routes.services import enrollment_queue
+from Routes.services.enrollment_queue import DONE, FAILED, PENDING, RUNNING, EnrollmentQueue, JobStore
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(enrollment_queue, "time", types.SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    store = JobStore(str(tmp_path / "queue.sqlite3"))
+    yield store
+    store.close()
+
+
+def status(store: JobStore, payment_id: str) -> str:
+    return store.conn.execute("SELECT status FROM enrollment_jobs WHERE payment_id = ?", (payment_id,)).fetchone()[0]
+
+
+def test_enqueue_is_keyed_on_payment_id(store):
+    assert store.enqueue("pay_1", {"email": "a@example.com"})
+    assert not store.enqueue("pay_1", {"email": "b@example.com"})
+    assert store.counts() == {PENDING: 1}
+
+
+def test_claim_takes_each_due_job_once(store):
+    store.enqueue("pay_1", {"n": 1})
+    store.enqueue("pay_2", {"n": 2})
+
+    first = store.claim(lease_seconds=60)
+    second = store.claim(lease_seconds=60)
+    assert {first["payment_id"], second["payment_id"]} == {"pay_1", "pay_2"}
+    assert store.claim(lease_seconds=60) is None
+    assert store.counts() == {RUNNING: 2}
+
+
+def test_expired_lease_is_claimed_again(store, clock):
+    store.enqueue("pay_1", {})
+    assert store.claim(lease_seconds=60)["attempts"] == 0
+
+    clock.now += 59
+    assert store.claim(lease_seconds=60) is None
+    clock.now += 1
+    reclaimed = store.claim(lease_seconds=60)
+    assert reclaimed["payment_id"] == "pay_1"
+    assert reclaimed["attempts"] == 1
+
+
+def test_fail_with_retry_waits_for_backoff(store, clock):
+    store.enqueue("pay_1", {})
+    store.claim(lease_seconds=60)
+    store.fail("pay_1", "Graphy 503", retry_at=clock.now + 30)
+    assert status(store, "pay_1") == PENDING
+    assert store.next_due_at() == clock.now + 30
+
+    assert store.claim(lease_seconds=60) is None
+    clock.now += 30
+    assert store.claim(lease_seconds=60)["attempts"] == 1
+
+
+def test_fail_without_retry_is_permanent_until_replayed(store, clock):
+    store.enqueue("pay_1", {})
+    store.enqueue("pay_2", {})
+    for _ in range(2):
+        job = store.claim(lease_seconds=60)
+        store.fail(job["payment_id"], "bad request", retry_at=None)
+    assert store.counts() == {FAILED: 2}
+    assert store.jobs(FAILED)[0]["last_error"] == "bad request"
+    assert store.claim(lease_seconds=60) is None
+
+    assert store.replay(["pay_1"]) == 1
+    assert status(store, "pay_1") == PENDING
+    assert status(store, "pay_2") == FAILED
+    assert store.replay() == 1
+    assert store.counts() == {PENDING: 2}
+    assert store.claim(lease_seconds=60)["attempts"] == 0
+
+
+def test_replay_leaves_other_statuses_alone(store):
+    store.enqueue("pay_1", {})
+    store.complete(store.claim(lease_seconds=60)["payment_id"])
+    assert store.replay(["pay_1"]) == 0
+    assert status(store, "pay_1") == DONE
+
+
+def test_queue_retries_then_marks_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr(enrollment_queue, "backoff_delay", lambda attempts, base, cap: 0)
+    monkeypatch.setattr(enrollment_queue, "POLL_INTERVAL", 0.01)
+    calls = []
+
+    async def handler(payload: dict) -> None:
+        calls.append(payload["payment"])
+        if payload["payment"] == "pay_bad" or calls.count("pay_ok") == 1:
+            raise RuntimeError("Graphy unavailable")
+
+    async def run() -> dict:
+        queue = EnrollmentQueue(handler, db_path=str(tmp_path / "queue.sqlite3"), workers=1, max_attempts=3)
+        await queue.start()
+        try:
+            await queue.enqueue("pay_ok", {"payment": "pay_ok"})
+            await queue.enqueue("pay_bad", {"payment": "pay_bad"})
+            for _ in range(200):
+                counts = await queue.counts()
+                if counts.get(DONE) == 1 and counts.get(FAILED) == 1:
+                    break
+                await asyncio.sleep(0.01)
+            return counts
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(run()) == {DONE: 1, FAILED: 1}
+    assert calls.count("pay_ok") == 2
+    assert calls.count("pay_bad") == 3
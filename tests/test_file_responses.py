@@ -0,0 +1,107 @@
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from Routes.services.file_responses import STATIC_MEMORY_CACHE_MAX_FILE, small_files
+from Routes.services.static_files import PrecompressedStaticFiles
+
+SMALL = bytes(range(256)) * 16
+LARGE = os.urandom(STATIC_MEMORY_CACHE_MAX_FILE + 3 * 1024 * 1024 + 17)
+FILES = {"small.bin": SMALL, "large.mp4": LARGE}
+
+
+@pytest.fixture
+def client(tmp_path):
+    for name, content in FILES.items():
+        (tmp_path / name).write_bytes(content)
+    app = Starlette(routes=[Mount("/media", app=PrecompressedStaticFiles(directory=tmp_path))])
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("name", FILES)
+def test_full_response(client, name):
+    content = FILES[name]
+    response = client.get(f"/media/{name}")
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-length"] == str(len(content))
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_only_small_files_are_cached_in_memory(client, tmp_path):
+    client.get("/media/small.bin")
+    client.get("/media/large.mp4", headers={"Range": "bytes=0-9,2000-2999"})
+    cached = set(small_files._entries)
+    assert os.path.join(tmp_path, "small.bin") in cached
+    assert os.path.join(tmp_path, "large.mp4") not in cached
+
+
+@pytest.mark.parametrize("name", FILES)
+def test_single_range(client, name):
+    content = FILES[name]
+    start, end = 100, len(content) - 200
+    response = client.get(f"/media/{name}", headers={"Range": f"bytes={start}-{end}"})
+    assert response.status_code == 206
+    assert response.content == content[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(content)}"
+    assert response.headers["content-length"] == str(end + 1 - start)
+
+
+def test_suffix_range(client):
+    response = client.get("/media/large.mp4", headers={"Range": "bytes=-1000"})
+    assert response.status_code == 206
+    assert response.content == LARGE[-1000:]
+
+
+@pytest.mark.parametrize("name", FILES)
+def test_multiple_ranges(client, name):
+    content = FILES[name]
+    response = client.get(f"/media/{name}", headers={"Range": "bytes=0-9,2000-2999"})
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1]
+    assert response.headers["content-length"] == str(len(response.content))
+
+    parts = response.content.split(f"--{boundary}".encode())
+    bodies = [part.split(b"\n\n", 1)[1][:-1] for part in parts[1:-1]]
+    assert bodies == [content[0:10], content[2000:3000]]
+    assert f"Content-Range: bytes 0-9/{len(content)}".encode() in parts[1]
+    assert parts[-1].startswith(b"--")
+    assert "content-range" not in response.headers
+
+
+def test_head_multiple_ranges(client):
+    response = client.head("/media/large.mp4", headers={"Range": "bytes=0-9,2000-2999"})
+    assert response.status_code == 206
+    assert response.content == b""
+    assert response.headers["content-type"].startswith("multipart/byteranges; boundary=")
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/media/small.bin", headers={"Range": f"bytes={len(SMALL) + 10}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"*/{len(SMALL)}"
+
+
+def test_if_range_matching_etag_sends_range(client):
+    etag = client.get("/media/large.mp4").headers["etag"]
+    response = client.get("/media/large.mp4", headers={"Range": "bytes=10-19", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.content == LARGE[10:20]
+
+
+def test_if_range_stale_etag_sends_whole_file(client):
+    response = client.get("/media/large.mp4", headers={"Range": "bytes=10-19", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == LARGE
+
+
+def test_head_range_sends_headers_only(client):
+    response = client.head("/media/large.mp4", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == b""
+    assert response.headers["content-length"] == "10"
@@ -0,0 +1,42 @@
+from email.utils import formatdate
+
+import pytest
+from starlette.datastructures import Headers
+
+from Routes.services.http_cache import is_not_modified
+
+ETAG = '"abc123"'
+MODIFIED = 1_700_000_000.0
+
+
+def not_modified(**headers: str) -> bool:
+    request_headers = Headers({name.replace("_", "-"): value for name, value in headers.items()})
+    return is_not_modified(request_headers, ETAG, MODIFIED)
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"other", "abc123"', True),
+    ('"other"', False),
+    ("*", True),
+    ('"abc123-gzip"', False),
+])
+def test_if_none_match(if_none_match, expected):
+    assert not_modified(if_none_match=if_none_match) is expected
+
+
+def test_if_modified_since():
+    assert not_modified(if_modified_since=formatdate(MODIFIED, usegmt=True))
+    assert not_modified(if_modified_since=formatdate(MODIFIED + 60, usegmt=True))
+    assert not not_modified(if_modified_since=formatdate(MODIFIED - 60, usegmt=True))
+    assert not not_modified(if_modified_since="not a date")
+
+
+def test_if_none_match_takes_precedence():
+    assert not not_modified(if_none_match='"other"', if_modified_since=formatdate(MODIFIED, usegmt=True))
+
+
+def test_no_validators():
+    assert not not_modified()
+    assert not is_not_modified(Headers({"if-modified-since": formatdate(MODIFIED, usegmt=True)}), ETAG)
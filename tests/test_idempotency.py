@@ -0,0 +1,127 @@
+import asyncio
+import types
+
+import pytest
+
+from Routes.services import idempotency
+from Routes.services.idempotency import IdempotencyCache, idempotency_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Replaces the module's `time` only; the event loop keeps the real clock
+    clock = types.SimpleNamespace(now=100.0)
+    monkeypatch.setattr(idempotency, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        return f"order_{self.calls}"
+
+
+def test_key_depends_on_every_part():
+    assert idempotency_key("a", "b") == idempotency_key("a", "b")
+    assert idempotency_key("a", "b") != idempotency_key("ab", "")
+    assert idempotency_key("a", None) == idempotency_key("a", "")
+
+
+def test_completed_result_is_reused_within_ttl(clock):
+    cache = IdempotencyCache("test", ttl=60, max_entries=10)
+    upstream = Upstream()
+
+    async def run():
+        first = await cache.run("key", upstream)
+        clock.now += 59
+        second = await cache.run("key", upstream)
+        return first, second
+
+    assert asyncio.run(run()) == ("order_1", "order_1")
+    assert upstream.calls == 1
+
+
+def test_expired_result_makes_a_fresh_call(clock):
+    cache = IdempotencyCache("test", ttl=60, max_entries=10)
+    upstream = Upstream()
+
+    async def run():
+        await cache.run("key", upstream)
+        clock.now += 60
+        return await cache.run("key", upstream)
+
+    assert asyncio.run(run()) == "order_2"
+    assert upstream.calls == 2
+
+
+def test_concurrent_duplicates_share_one_call(clock):
+    cache = IdempotencyCache("test", ttl=60, max_entries=10)
+    upstream = Upstream()
+
+    async def run():
+        upstream.release = asyncio.Event()
+        tasks = [asyncio.create_task(cache.run("key", upstream)) for _ in range(5)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == ["order_1"] * 5
+    assert upstream.calls == 1
+
+
+def test_failure_is_shared_but_not_cached(clock):
+    cache = IdempotencyCache("test", ttl=60, max_entries=10)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Razorpay 502")
+
+    async def run():
+        results = await asyncio.gather(cache.run("key", failing), cache.run("key", failing), return_exceptions=True)
+        assert len(cache) == 0
+        return results, await cache.run("key", Upstream())
+
+    results, retried = asyncio.run(run())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert len(calls) == 1
+    assert retried == "order_1"
+
+
+def test_cancelled_call_is_not_cached(clock):
+    cache = IdempotencyCache("test", ttl=60, max_entries=10)
+    upstream = Upstream()
+
+    async def run():
+        upstream.release = asyncio.Event()
+        task = asyncio.create_task(cache.run("key", upstream))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        upstream.release = None
+        return await cache.run("key", upstream)
+
+    assert asyncio.run(run()) == "order_2"
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = IdempotencyCache("test", ttl=60, max_entries=2)
+    upstream = Upstream()
+
+    async def run():
+        await cache.run("a", upstream)
+        await cache.run("b", upstream)
+        await cache.run("a", upstream)
+        await cache.run("c", upstream)
+        return await cache.run("a", upstream), await cache.run("b", upstream)
+
+    assert asyncio.run(run()) == ("order_1", "order_4")
+    assert len(cache) == 2
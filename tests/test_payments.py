@@ -0,0 +1,51 @@
+import itertools
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from Routes import payments
+from Routes.services.idempotency import IdempotencyCache
+
+ORDER = {"course_id": "fundamentals-of-facebook-ads", "name": "Asha", "email": "asha@example.com", "phone": "9999999999"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    ids = itertools.count(1)
+
+    async def create_order(data: dict) -> dict:
+        return {"id": f"order_{next(ids)}"}
+
+    monkeypatch.setattr(payments.orders_client, "create_order", create_order)
+    monkeypatch.setattr(payments, "recent_orders", IdempotencyCache("create_order", ttl=300, max_entries=100))
+    app = FastAPI()
+    app.include_router(payments.router)
+    return TestClient(app, headers={"Origin": "http://localhost"})
+
+
+def order_id(client: TestClient, body: dict, **headers) -> str:
+    response = client.post("/api/create-order", json=body, headers=headers)
+    assert response.status_code == 200
+    return response.json()["order_id"]
+
+
+def test_requests_without_a_key_create_separate_orders(client):
+    assert order_id(client, ORDER) != order_id(client, ORDER)
+
+
+def test_retry_with_the_same_key_reuses_the_order(client):
+    first = order_id(client, ORDER, **{"Idempotency-Key": "checkout-1"})
+    assert order_id(client, ORDER, **{"Idempotency-Key": "checkout-1"}) == first
+    assert order_id(client, dict(ORDER, idempotency_key="checkout-1")) == first
+    assert order_id(client, ORDER, **{"Idempotency-Key": "checkout-2"}) != first
+
+
+def test_same_key_with_different_customer_details_creates_a_new_order(client):
+    first = order_id(client, ORDER, **{"Idempotency-Key": "checkout-1"})
+    assert order_id(client, dict(ORDER, name="Ravi"), **{"Idempotency-Key": "checkout-1"}) != first
+
+
+def test_overlong_key_is_rejected(client):
+    response = client.post("/api/create-order", json=ORDER, headers={"Idempotency-Key": "x" * 129})
+    assert response.status_code == 400
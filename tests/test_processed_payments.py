@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from Routes.services.processed_payments import ProcessedPayments
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "processed_payments.sqlite3")
+
+
+def test_only_the_exact_verified_payment_matches(db_path):
+    async def run():
+        payments = ProcessedPayments(db_path)
+        await payments.load()
+        assert not payments.is_processed("pay_1", "order_1", "sig_1")
+        await payments.record("pay_1", "order_1", "sig_1")
+        try:
+            return [
+                payments.is_processed("pay_1", "order_1", "sig_1"),
+                payments.is_processed("pay_1", "order_2", "sig_1"),
+                payments.is_processed("pay_1", "order_1", "sig_2"),
+                payments.is_processed("pay_2", "order_1", "sig_1"),
+            ]
+        finally:
+            await payments.close()
+
+    assert asyncio.run(run()) == [True, False, False, False]
+
+
+def test_recorded_payments_survive_a_restart(db_path):
+    async def first_process():
+        payments = ProcessedPayments(db_path)
+        await payments.load()
+        await payments.record("pay_1", "order_1", "sig_1")
+        await payments.record("pay_1", "order_1", "sig_1")
+        await payments.close()
+
+    async def second_process():
+        payments = ProcessedPayments(db_path)
+        await payments.load()
+        try:
+            return len(payments), payments.is_processed("pay_1", "order_1", "sig_1")
+        finally:
+            await payments.close()
+
+    asyncio.run(first_process())
+    assert asyncio.run(second_process()) == (1, True)
+
+
+def test_payment_recorded_by_another_worker_is_verified_again(db_path):
+    async def run():
+        worker_a, worker_b = ProcessedPayments(db_path), ProcessedPayments(db_path)
+        await worker_a.load()
+        await worker_b.load()
+        try:
+            await worker_a.record("pay_1", "order_1", "sig_1")
+            # Not in worker B's index until it records the payment itself
+            assert not worker_b.is_processed("pay_1", "order_1", "sig_1")
+            await worker_b.record("pay_1", "order_1", "sig_1")
+            assert worker_b.is_processed("pay_1", "order_1", "sig_1")
+            return worker_b.conn.execute("SELECT COUNT(*) FROM processed_payments").fetchone()[0]
+        finally:
+            await worker_a.close()
+            await worker_b.close()
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,202 @@
+import asyncio
+import types
+
+import pytest
+
+from Routes.services import graphy, resilience
+from Routes.services.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    LimiterTimeout,
+    RetryBudget,
+    backoff_delay,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Replaces the module's `time` only; the event loop keeps the real clock
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(resilience, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def open_breaker(clock) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", "op", failure_threshold=3, recovery_time=30)
+    for _ in range(3):
+        breaker.check()
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", "op", failure_threshold=3, recovery_time=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.check() is False
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.snapshot()["retry_in_seconds"] == 30
+
+
+def test_half_open_admits_one_probe_that_closes_the_circuit(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.check() is False
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    assert breaker.check() is True
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.now += 1
+    assert breaker.check() is True
+
+
+def test_released_probe_lets_the_next_call_probe(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    assert breaker.check() is True
+    breaker.release_probe()
+    assert breaker.check() is True
+
+
+def test_probe_that_never_reports_back_stops_blocking(clock):
+    breaker = open_breaker(clock)
+    clock.now += 30
+    assert breaker.check() is True
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.now += 1
+    assert breaker.check() is True
+
+
+def test_graphy_hands_back_probe_rejected_by_the_limiter(clock, monkeypatch):
+    breaker = CircuitBreaker("graphy-test", "assign", failure_threshold=1, recovery_time=30)
+    monkeypatch.setitem(graphy.breakers, "assign", breaker)
+    breaker.record_failure()
+    clock.now += 30
+
+    async def full(operation: str = "") -> None:
+        raise LimiterTimeout("full")
+
+    monkeypatch.setattr(graphy.limiter, "acquire", full)
+    with pytest.raises(LimiterTimeout):
+        asyncio.run(graphy._send("assign", {}))
+    assert breaker.check() is True
+
+
+def test_limiter_grows_after_a_window_of_fast_calls(clock):
+    limiter = AdaptiveLimiter("test", initial=2, minimum=1, maximum=4, wait_timeout=1)
+
+    async def run():
+        for _ in range(2):
+            await limiter.acquire()
+            limiter.release(0.1, True)
+
+    asyncio.run(run())
+    assert limiter.limit == 3
+    assert limiter.baseline == pytest.approx(0.1)
+
+
+def test_limiter_shrinks_on_slow_or_failed_calls_with_cooldown(clock):
+    limiter = AdaptiveLimiter("test", initial=8, minimum=2, maximum=8, wait_timeout=1)
+
+    async def call(latency: float, ok: bool) -> None:
+        await limiter.acquire()
+        limiter.release(latency, ok)
+
+    async def run():
+        await call(0.1, True)
+        await call(0.5, True)
+        assert limiter.limit == 6
+        # Within the cooldown another slow call leaves the limit alone
+        await call(0.5, True)
+        assert limiter.limit == 6
+        clock.now += limiter.DECREASE_COOLDOWN
+        await call(0.1, False)
+        assert limiter.limit == 4
+        for _ in range(3):
+            clock.now += limiter.DECREASE_COOLDOWN
+            await call(0.1, False)
+        assert limiter.limit == 2
+
+    asyncio.run(run())
+
+
+def test_abandoned_call_leaves_the_limit_unchanged(clock):
+    limiter = AdaptiveLimiter("test", initial=4, minimum=1, maximum=8, wait_timeout=1)
+
+    async def run():
+        await limiter.acquire()
+        limiter.release(10.0, None)
+
+    asyncio.run(run())
+    assert (limiter.limit, limiter.in_flight, limiter.baseline) == (4, 0, None)
+
+
+def test_limiter_times_out_waiting_for_a_slot():
+    limiter = AdaptiveLimiter("test", initial=1, minimum=1, maximum=1, wait_timeout=0.05)
+
+    async def run():
+        await limiter.acquire()
+        with pytest.raises(LimiterTimeout):
+            await limiter.acquire()
+        assert limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_limiter_wakes_a_waiter_on_release():
+    limiter = AdaptiveLimiter("test", initial=1, minimum=1, maximum=1, wait_timeout=5)
+
+    async def run():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        limiter.release(0.1, True)
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_retry_budget_is_a_fraction_of_calls():
+    budget = RetryBudget(ratio=0.5, max_tokens=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_backoff_delay_is_capped_exponential():
+    for attempts in range(1, 10):
+        assert 0 <= backoff_delay(attempts, base=1, cap=8) <= min(8, 2 ** (attempts - 1))
@@ -0,0 +1,109 @@
+import os
+import re
+
+import pytest
+
+from Routes.services import templates
+from Routes.services.templates import (
+    PROJECT_ROOT,
+    TemplateError,
+    compile_layout,
+    extends,
+    load_page,
+    page_mtime_ns,
+    render,
+)
+
+LAYOUT = "<p>{% block price %}{% endblock %}</p><b>{% block plan %}{% endblock %}</b>"
+PAGE = '{% extends "layouts/cart.html" %}\n{% block price %}₹9,991{% endblock %}\n{% block plan %}value{% endblock %}\n'
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "_layouts", {})
+    (tmp_path / "layouts").mkdir()
+    (tmp_path / "layouts" / "cart.html").write_text(LAYOUT, encoding="utf-8")
+    return tmp_path
+
+
+def set_mtime(path, mtime_ns: int) -> None:
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_render_fills_every_block(root):
+    assert render("page.html", PAGE, root) == "<p>₹9,991</p><b>value</b>"
+
+
+def test_block_content_is_verbatim(root):
+    page = '{% extends "layouts/cart.html" %}{% block price %}\n  {{ not a tag }}\n{% endblock %}{% block plan %}{% endblock %}'
+    assert render("page.html", page, root) == "<p>\n  {{ not a tag }}\n</p><b></b>"
+
+
+def test_extends():
+    assert extends(PAGE) == "layouts/cart.html"
+    assert extends('  \n{% extends "a.html" %}') == "a.html"
+    assert extends("<html>{% extends \"a.html\" %}") is None
+
+
+@pytest.mark.parametrize("page, message", [
+    ('{% extends "layouts/cart.html" %}{% block price %}1{% endblock %}', "missing blocks ['plan']"),
+    (PAGE + "{% block extra %}x{% endblock %}", "unknown blocks ['extra']"),
+    (PAGE + "{% block plan %}again{% endblock %}", "block 'plan' is defined twice"),
+    (PAGE + "<div>stray</div>", "text outside a block"),
+    ('{% extends "layouts/cart.html" %}{% block price %}{% if x %}{% endblock %}{% block plan %}{% endblock %}', "contains a template tag"),
+    ('{% extends "layouts/missing.html" %}', "layout not found: layouts/missing.html"),
+    ("<html></html>", "does not extend a layout"),
+])
+def test_render_errors(root, page, message):
+    with pytest.raises(TemplateError, match=re.escape(message)):
+        render("page.html", page, root)
+
+
+@pytest.mark.parametrize("layout, message", [
+    ("{% block a %}default{% endblock %}", "layout block 'a' must be empty"),
+    ("{% block a %}{% endblock %}{% block a %}{% endblock %}", "block 'a' is defined twice"),
+    ('{% extends "other.html" %}', "cannot extend another layout"),
+    ("<p>{% include \"x.html\" %}</p>", "unexpected tag"),
+])
+def test_layout_errors(layout, message):
+    with pytest.raises(TemplateError, match=re.escape(message)):
+        compile_layout("layouts/bad.html", layout)
+
+
+def test_layout_is_recompiled_when_it_changes(root):
+    layout_path = root / "layouts" / "cart.html"
+    set_mtime(layout_path, 1_000_000_000_000_000_000)
+    assert render("page.html", PAGE, root) == "<p>₹9,991</p><b>value</b>"
+
+    layout_path.write_text("<i>{% block plan %}{% endblock %} {% block price %}{% endblock %}</i>", encoding="utf-8")
+    set_mtime(layout_path, 1_000_000_000_000_000_001)
+    assert render("page.html", PAGE, root) == "<i>value ₹9,991</i>"
+
+
+def test_load_page_reports_newest_source_mtime(root):
+    page_path = root / "page.html"
+    page_path.write_text(PAGE, encoding="utf-8")
+    layout_path = root / "layouts" / "cart.html"
+    set_mtime(page_path, 2_000_000_000_000_000_000)
+    set_mtime(layout_path, 1_000_000_000_000_000_000)
+
+    source = load_page("page.html", page_path, root)
+    assert source.body == "<p>₹9,991</p><b>value</b>".encode("utf-8")
+    assert source.mtime_ns == page_mtime_ns(page_path, root) == 2_000_000_000_000_000_000
+
+    set_mtime(layout_path, 3_000_000_000_000_000_000)
+    assert load_page("page.html", page_path, root).mtime_ns == page_mtime_ns(page_path, root) == 3_000_000_000_000_000_000
+
+
+def test_standalone_page_is_loaded_as_is(root):
+    page_path = root / "plain.html"
+    page_path.write_bytes(b"<html>{% block x %}{% endblock %}</html>")
+    source = load_page("plain.html", page_path, root)
+    assert source.body == b"<html>{% block x %}{% endblock %}</html>"
+    assert source.mtime_ns == page_path.stat().st_mtime_ns
+
+
+@pytest.mark.parametrize("path", sorted((PROJECT_ROOT / "components").glob("*.html")), ids=lambda path: path.name)
+def test_every_component_page_renders(path):
+    source = load_page(f"components/{path.name}", path)
+    assert b"{% " not in source.body